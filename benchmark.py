@@ -0,0 +1,250 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the benchmark suite of the board operations. It runs
+without a display on seeded boards of several sizes, writes the results as
+JSON and compares them against a stored baseline.
+
+Example:
+    python benchmark.py --save-baseline baseline.json
+    python benchmark.py --baseline baseline.json --sizes 8 16 64 128
+"""
+
+from typing import Any, Callable, Dict, List
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from src.logic import BoardLogic
+
+Operation = Callable[[], Any]
+
+
+def _settle(board: BoardLogic) -> None:
+    # Refill the holes left by a previous operation
+    if any(tile is None for row in board.tiles for tile in row):
+        board.get_falling_tiles()
+
+
+def _legal_swap(board: BoardLogic, rng: random.Random) -> List[Any]:
+    _settle(board)
+    if not board.is_match_board():
+        board.randomize_board()
+    i, j, di, dj = rng.choice(board.move_index.all_moves())
+    return [board.tiles[i][j], board.tiles[i + di][j + dj]]
+
+
+def _swapped(board: BoardLogic, rng: random.Random) -> List[Any]:
+    tiles = _legal_swap(board, rng)
+    board.swap_tiles(*tiles)
+    board.matches = []
+    return tiles
+
+
+def bench_init(board: BoardLogic, rng: random.Random) -> Operation:
+    seed = rng.getrandbits(64)
+    return lambda: BoardLogic(board.width, board.height, board.num_colors, seed=seed)
+
+
+def bench_calculate_matches_for(board: BoardLogic, rng: random.Random) -> Operation:
+    tiles = _legal_swap(board, rng)
+
+    def operation():
+        board.swap_tiles(*tiles)
+        board.matches = []
+        board.calculate_matches_for(tiles)
+        board.matches = []
+        board.swap_tiles(*tiles)
+
+    return operation
+
+
+def bench_is_match_board(board: BoardLogic, rng: random.Random) -> Operation:
+    return board.is_match_board
+
+
+def bench_move_index_rebuild(board: BoardLogic, rng: random.Random) -> Operation:
+    _settle(board)
+    return board.move_index.rebuild
+
+
+def bench_randomize_board(board: BoardLogic, rng: random.Random) -> Operation:
+    _settle(board)
+    return board.randomize_board
+
+
+def bench_calculate_power_ups(board: BoardLogic, rng: random.Random) -> Operation:
+    tiles = _swapped(board, rng)
+    board.calculate_matches_for(tiles)
+
+    def operation():
+        board.calculate_power_ups(tiles)
+        board.matches = []
+        board.swap_tiles(*tiles)
+
+    return operation
+
+
+def bench_remove_matches(board: BoardLogic, rng: random.Random) -> Operation:
+    tiles = _swapped(board, rng)
+    board.calculate_matches_for(tiles)
+
+    return board.remove_matches
+
+
+def bench_get_falling_tiles(board: BoardLogic, rng: random.Random) -> Operation:
+    _settle(board)
+
+    # Remove about a tenth of the tiles
+    for _ in range(max(1, board.width * board.height // 10)):
+        board.remove_tile(rng.randrange(board.height), rng.randrange(board.width))
+
+    return board.get_falling_tiles
+
+
+def bench_cascade(board: BoardLogic, rng: random.Random) -> Operation:
+    tiles = _swapped(board, rng)
+    return lambda: board.resolve(tiles)
+
+
+CASES: Dict[str, Callable[[BoardLogic, random.Random], Operation]] = {
+    "init": bench_init,
+    "calculate_matches_for": bench_calculate_matches_for,
+    "is_match_board": bench_is_match_board,
+    "move_index_rebuild": bench_move_index_rebuild,
+    "randomize_board": bench_randomize_board,
+    "calculate_power_ups": bench_calculate_power_ups,
+    "remove_matches": bench_remove_matches,
+    "get_falling_tiles": bench_get_falling_tiles,
+    "cascade": bench_cascade,
+}
+
+
+def run_case(
+    setup: Callable[[BoardLogic, random.Random], Operation],
+    board: BoardLogic,
+    rng: random.Random,
+    min_time: float,
+    max_iterations: int,
+) -> Dict[str, float]:
+    # Only the operation is timed, the setup of each iteration is not.
+    elapsed = 0.0
+    iterations = 0
+
+    while elapsed < min_time and iterations < max_iterations:
+        operation = setup(board, rng)
+        start = time.perf_counter()
+        operation()
+        elapsed += time.perf_counter() - start
+        iterations += 1
+
+    # Memory is measured on a separate run because tracing slows it down
+    operation = setup(board, rng)
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    operation()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "iterations": iterations,
+        "ops_per_sec": iterations / elapsed if elapsed > 0 else 0,
+        "mean_us": elapsed / iterations * 1e6,
+        "allocated_bytes": after - before,
+        "peak_bytes": peak - before,
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Dict[str, Dict[str, float]]]:
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+
+    for size in args.sizes:
+        key = f"{size}x{size}"
+        results[key] = {}
+        rng = random.Random(args.seed)
+        board = BoardLogic(size, size, args.colors, seed=args.seed)
+
+        for name in args.cases:
+            results[key][name] = run_case(
+                CASES[name], board, rng, args.min_time, args.max_iterations
+            )
+            print(
+                f"{key:>9} {name:<22} {results[key][name]['ops_per_sec']:>12.1f} ops/s"
+                f" {results[key][name]['peak_bytes'] / 1024:>10.1f} KiB peak",
+                file=sys.stderr,
+            )
+
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, Dict[str, float]]],
+    baseline: Dict[str, Dict[str, Dict[str, float]]],
+    tolerance: float,
+) -> bool:
+    ok = True
+
+    for size, cases in results.items():
+        for name, result in cases.items():
+            base = baseline.get(size, {}).get(name)
+            if base is None or base["ops_per_sec"] == 0:
+                continue
+            ratio = result["ops_per_sec"] / base["ops_per_sec"]
+            regression = ratio < 1 - tolerance
+            ok = ok and not regression
+            print(
+                f"{size:>9} {name:<22} {ratio:>8.2f}x"
+                + ("  REGRESSION" if regression else ""),
+                file=sys.stderr,
+            )
+
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Match-3 board benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 16, 64, 128])
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--colors", type=int, default=18)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--max-iterations", type=int, default=10000)
+    parser.add_argument("--output", help="file to write the results as JSON")
+    parser.add_argument("--baseline", help="results to compare against")
+    parser.add_argument("--save-baseline", help="file to store the results as baseline")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.1, help="allowed slowdown (0.1 = 10%%)"
+    )
+    args = parser.parse_args()
+
+    results = run(args)
+    report = {"python": sys.version.split()[0], "seed": args.seed, "results": results}
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        if not compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
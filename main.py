@@ -6,12 +6,44 @@ Author: Alejandro Mujica
 alejandro.j.mujic4@gmail.com
 
 This file contains the main program to run the game.
+
+With --bot the game is played without a window nor sound by a bot, as fast
+as possible, and the throughput is reported at the end:
+    python main.py --bot --speed 8 --duration 600 --policy greedy
 """
 
-import settings
-from src.Match3 import Match3
+import argparse
+import os
 
 if __name__ == "__main__":
+    # Imported here because the analysis worker is a spawned process, which
+    # runs this file again as __mp_main__ and must not load pygame.
+    import settings
+    from src.Match3 import Match3
+    from src.logic.Simulator import POLICIES
+
+    parser = argparse.ArgumentParser(description="Match-3")
+    parser.add_argument("--bot", action="store_true", help="play headless with a bot")
+    parser.add_argument(
+        "--speed", type=int, default=8, help="logic ticks per frame of the bot"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=300, help="game seconds to play"
+    )
+    parser.add_argument(
+        "--policy",
+        default="greedy",
+        choices=sorted(POLICIES),
+        help="move policy of the bot",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="seed of the games")
+    args = parser.parse_args()
+
+    if args.bot:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+        settings.GAME_SEED = args.seed
+
     match3 = Match3(
         "Match 3",
         settings.WINDOW_WIDTH,
@@ -19,4 +51,16 @@ if __name__ == "__main__":
         settings.VIRTUAL_WIDTH,
         settings.VIRTUAL_HEIGHT,
     )
-    match3.exec()
+
+    if args.bot:
+        from src.Bot import Bot
+
+        report = Bot(args.policy, args.speed, args.seed).run(match3, args.duration)
+        match3.close()
+
+        for name, value in report.items():
+            if isinstance(value, float):
+                value = f"{value:.2f}"
+            print(f"{name}: {value}")
+    else:
+        match3.exec()
@@ -0,0 +1,54 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the program to replay recorded games without animations
+and check that they end with the recorded score.
+
+Example:
+    python replay.py logs/*.m3log
+"""
+
+import argparse
+import sys
+import time
+
+from src.logic.MoveLog import MoveLog
+from src.logic.Replayer import Replayer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Match-3 move log replayer")
+    parser.add_argument("logs", nargs="+", help="move log files")
+    args = parser.parse_args()
+
+    failed = 0
+
+    for path in args.logs:
+        log = MoveLog.load(path)
+        start = time.perf_counter()
+
+        try:
+            score = Replayer(log).run()
+        except ValueError as error:
+            print(f"{path}: {error}")
+            failed += 1
+            continue
+
+        elapsed = time.perf_counter() - start
+        ok = score == log.score
+        failed += not ok
+        print(
+            f"{path}: {len(log.moves)} moves in {elapsed * 1000:.1f} ms,"
+            f" score {score} (recorded {log.score}) {'OK' if ok else 'MISMATCH'}"
+        )
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,8 @@ alejandro.j.mujic4@gmail.com
 
 This file contains the game settings that include the association of the
 inputs with an their ids, constants of values to set up the game, sounds,
-textures, frames, and fonts.
+textures, frames, and fonts. Assets are loaded lazily through an
+AssetManager.
 """
 
 from pathlib import Path
@@ -16,6 +17,7 @@ import pygame
 
 from gale import input_handler
 
+from src.AssetManager import AssetManager
 from src.frames_utility import generate_tile_frames
 from src.frames_utility import generate_power_up_frames
 
@@ -51,38 +53,96 @@ BACKGROUND_LOOPING_POINT = -1024 + VIRTUAL_WIDTH - 4 + 51
 
 LEVEL_TIME = 60
 
+# The logic runs TICK_RATE times per second whatever the frame rate is.
+# Rendering is capped at FPS, and in adaptive mode it may go down to MIN_FPS
+# when the frames take too long.
+TICK_RATE = 60
+FPS = 60
+ADAPTIVE_FPS = False
+MIN_FPS = 20
+
+# Seed of the games, None for a different game each time. With
+# RECORD_MOVE_LOGS every game is recorded into a move log in MOVE_LOG_DIR
+# that replay.py can play again.
+GAME_SEED = None
+RECORD_MOVE_LOGS = False
+
+# After IDLE_DELAY seconds without input, animations nor state changes the
+# game renders only IDLE_FPS frames per second until an event arrives.
+IDLE_DELAY = 1
+IDLE_FPS = 4
+
+# Boards are analyzed in a worker process, so looking for a hint never costs
+# a frame. The hint is shown after HINT_DELAY seconds without a move.
+ANALYSIS_WORKER = True
+HINT_DELAY = 5
+
+# Redraw and present only the regions that changed in the frame. The
+# background does not scroll in this mode.
+DIRTY_RECT_RENDERING = False
+
 BASE_DIR = Path(__file__).parent
 
-TEXTURES = {
-    "background": pygame.image.load(
-        BASE_DIR / "assets" / "textures" / "background.png"
-    ),
-    "tiles": pygame.image.load(BASE_DIR / "assets" / "textures" / "match3.png"),
-    "power_ups": pygame.image.load(BASE_DIR / "assets" / "textures" / "match3_power_ups.png"),
-}
-
-FRAMES = {"tiles": generate_tile_frames(TEXTURES["tiles"]),
-          "power_ups": generate_power_up_frames(TEXTURES["power_ups"])
-}
-
-pygame.mixer.init()
-
-SOUNDS = {
-    "clock": pygame.mixer.Sound(BASE_DIR / "assets" / "sounds" / "clock.wav"),
-    "error": pygame.mixer.Sound(BASE_DIR / "assets" / "sounds" / "error.wav"),
-    "game-over": pygame.mixer.Sound(BASE_DIR / "assets" / "sounds" / "game-over.wav"),
-    "match": pygame.mixer.Sound(BASE_DIR / "assets" / "sounds" / "match.wav"),
-    "next-level": pygame.mixer.Sound(BASE_DIR / "assets" / "sounds" / "next-level.wav"),
-    "select": pygame.mixer.Sound(BASE_DIR / "assets" / "sounds" / "select.wav"),
-}
-
-pygame.mixer.music.load(BASE_DIR / "assets" / "sounds" / "music.mp3")
-
-pygame.font.init()
-
-FONTS = {
-    "small": pygame.font.Font(BASE_DIR / "assets" / "fonts" / "font.ttf", 12),
-    "medium": pygame.font.Font(BASE_DIR / "assets" / "fonts" / "font.ttf", 24),
-    "large": pygame.font.Font(BASE_DIR / "assets" / "fonts" / "font.ttf", 48),
-    "huge": pygame.font.Font(BASE_DIR / "assets" / "fonts" / "font.ttf", 64),
-}
+MOVE_LOG_DIR = BASE_DIR / "logs"
+
+ASSETS = AssetManager()
+
+
+# The mixer and the font module are initialized by the game in the main
+# thread before the assets are loaded
+def load_sound(path: Path) -> pygame.mixer.Sound:
+    return pygame.mixer.Sound(path)
+
+
+def load_font(size: int) -> pygame.font.Font:
+    return pygame.font.Font(BASE_DIR / "assets" / "fonts" / "font.ttf", size)
+
+
+TEXTURES = ASSETS.add(
+    "textures",
+    {
+        "background": lambda: pygame.image.load(
+            BASE_DIR / "assets" / "textures" / "background.png"
+        ),
+        "tiles": lambda: pygame.image.load(
+            BASE_DIR / "assets" / "textures" / "match3.png"
+        ),
+        "power_ups": lambda: pygame.image.load(
+            BASE_DIR / "assets" / "textures" / "match3_power_ups.png"
+        ),
+    },
+    converter=lambda surface: surface.convert_alpha(),
+)
+
+FRAMES = ASSETS.add(
+    "frames",
+    {
+        "tiles": lambda: generate_tile_frames(TEXTURES.load("tiles")),
+        "power_ups": lambda: generate_power_up_frames(TEXTURES.load("power_ups")),
+    },
+)
+
+SOUNDS = ASSETS.add(
+    "sounds",
+    {
+        name: (lambda name=name: load_sound(BASE_DIR / "assets" / "sounds" / f"{name}.wav"))
+        for name in ("clock", "error", "game-over", "match", "next-level", "select")
+    },
+)
+
+MUSIC = BASE_DIR / "assets" / "sounds" / "music.mp3"
+
+FONTS = ASSETS.add(
+    "fonts",
+    {
+        "small": lambda: load_font(12),
+        "medium": lambda: load_font(24),
+        "large": lambda: load_font(48),
+        "huge": lambda: load_font(64),
+    },
+    # SDL_ttf is not thread safe, fonts are created when first used
+    background=False,
+)
+
+# Print how long each asset took to load once the prefetch finishes
+PRINT_ASSET_TIMINGS = False
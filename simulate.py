@@ -0,0 +1,156 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the program to balance the levels by playing many
+simulated games in parallel. Every game is streamed to a JSON-lines file as
+soon as it finishes and a summary is printed at the end.
+
+Example:
+    python simulate.py --games 2000 --colors 6 12 18 --sizes 8x8 10x10
+"""
+
+from typing import Any, Dict, List, Tuple
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import statistics
+from collections import Counter, defaultdict
+
+from src.logic.Simulator import POLICIES, Simulator
+
+
+def run_game(task: Dict[str, Any]) -> Dict[str, Any]:
+    return Simulator(**task).play_game()
+
+
+def parse_size(size: str) -> Tuple[int, int]:
+    width, height = size.lower().split("x")
+    return int(width), int(height)
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def new_groups() -> Dict[str, Dict[str, Any]]:
+    return defaultdict(
+        lambda: {
+            "games": 0,
+            "reached": Counter(),
+            "cleared": Counter(),
+            "score_per_second": [],
+            "cascades": Counter(),
+        }
+    )
+
+
+def accumulate(groups: Dict[str, Dict[str, Any]], result: Dict[str, Any]) -> None:
+    group = groups[
+        f"{result['width']}x{result['height']} colors={result['num_colors']}"
+    ]
+    group["games"] += 1
+
+    for level in result["levels"]:
+        group["reached"][level["level"]] += 1
+        group["cleared"][level["level"]] += int(level["cleared"])
+        group["score_per_second"].append(level["score_per_second"])
+        group["cascades"].update(level["cascades"])
+
+
+def summarize(groups: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    summary = {}
+
+    for key, group in sorted(groups.items()):
+        sps = group["score_per_second"]
+        summary[key] = {
+            "games": group["games"],
+            "clear_probability": {
+                level: group["cleared"][level] / reached
+                for level, reached in sorted(group["reached"].items())
+            },
+            "score_per_second": {
+                "mean": statistics.fmean(sps) if sps else 0,
+                "p10": percentile(sps, 0.1),
+                "p50": percentile(sps, 0.5),
+                "p90": percentile(sps, 0.9),
+            },
+            "cascade_depth": dict(sorted(group["cascades"].items())),
+        }
+
+    return summary
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    for key, group in summary.items():
+        print(f"{key} ({group['games']} games)")
+        sps = group["score_per_second"]
+        print(
+            f"  score/s: mean {sps['mean']:.1f} p10 {sps['p10']:.1f} "
+            f"p50 {sps['p50']:.1f} p90 {sps['p90']:.1f}"
+        )
+        print(
+            "  cascade depth: "
+            + " ".join(f"{d}:{n}" for d, n in group["cascade_depth"].items())
+        )
+        for level, p in group["clear_probability"].items():
+            print(f"  level {level}: {p:.1%} cleared")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Match-3 level balancing")
+    parser.add_argument("--games", type=int, default=1000, help="games per setup")
+    parser.add_argument("--colors", type=int, nargs="+", default=[18])
+    parser.add_argument("--sizes", nargs="+", default=["8x8"])
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--think-time", type=float, default=0.5)
+    parser.add_argument("--max-levels", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="simulation.jsonl")
+    args = parser.parse_args()
+
+    tasks = [
+        {
+            "width": width,
+            "height": height,
+            "num_colors": num_colors,
+            "policy": args.policy,
+            "think_time": args.think_time,
+            "max_levels": args.max_levels,
+            "seed": args.seed * 1_000_003 + n,
+        }
+        for n, (num_colors, (width, height), _) in enumerate(
+            itertools.product(
+                args.colors, map(parse_size, args.sizes), range(args.games)
+            )
+        )
+    ]
+
+    groups = new_groups()
+
+    with multiprocessing.Pool(args.workers) as pool, open(args.output, "w") as f:
+        chunksize = max(1, len(tasks) // (args.workers * 16))
+        for result in pool.imap_unordered(run_game, tasks, chunksize=chunksize):
+            f.write(json.dumps(result) + "\n")
+            f.flush()
+            accumulate(groups, result)
+
+    summary = summarize(groups)
+
+    with open(args.output + ".summary.json", "w") as f:
+        json.dump(summary, f, indent=2)
+
+    print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the classes AssetManager and LazyAssets. Assets are loaded
+the first time they are used or by a prefetch thread, and surfaces are
+converted to the display format once the window exists. Categories that
+must be created in the main thread are left out of the prefetch.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import threading
+import time
+
+import pygame
+
+
+class LazyAssets(Mapping):
+    def __init__(
+        self,
+        manager: "AssetManager",
+        category: str,
+        loaders: Dict[str, Callable[[], Any]],
+        converter: Optional[Callable[[Any], Any]] = None,
+        background: bool = True,
+    ) -> None:
+        self.manager = manager
+        self.category = category
+        self.loaders = loaders
+        self.converter = converter
+        self.background = background
+        self.assets: Dict[str, Any] = {}
+        self.converted = set()
+        self.locks = {name: threading.Lock() for name in loaders}
+
+    def load(self, name: str) -> Any:
+        asset = self.assets.get(name)
+
+        if asset is None:
+            with self.locks[name]:
+                asset = self.assets.get(name)
+                if asset is None:
+                    start = time.perf_counter()
+                    asset = self.loaders[name]()
+                    self.manager.timings[f"{self.category}/{name}"] = (
+                        time.perf_counter() - start
+                    )
+                    self.assets[name] = asset
+
+        return asset
+
+    def __getitem__(self, name: str) -> Any:
+        asset = self.load(name)
+
+        # Conversion needs the display, so it happens in the main thread the
+        # first time the asset is used after the window was created.
+        if (
+            self.converter is not None
+            and name not in self.converted
+            and pygame.display.get_surface() is not None
+        ):
+            asset = self.converter(asset)
+            self.assets[name] = asset
+            self.converted.add(name)
+
+        return asset
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.loaders)
+
+    def __len__(self) -> int:
+        return len(self.loaders)
+
+
+class AssetManager:
+    def __init__(self) -> None:
+        self.categories: List[LazyAssets] = []
+        self.timings: Dict[str, float] = {}
+
+    def add(
+        self,
+        category: str,
+        loaders: Dict[str, Callable[[], Any]],
+        converter: Optional[Callable[[Any], Any]] = None,
+        background: bool = True,
+    ) -> LazyAssets:
+        assets = LazyAssets(self, category, loaders, converter, background)
+        self.categories.append(assets)
+        return assets
+
+    def prefetch(self, on_finish: Optional[Callable[[], None]] = None) -> threading.Thread:
+        def load_all():
+            for assets in self.categories:
+                if not assets.background:
+                    continue
+
+                for name in assets:
+                    assets.load(name)
+
+            if on_finish is not None:
+                on_finish()
+
+        thread = threading.Thread(target=load_all, name="asset-prefetch", daemon=True)
+        thread.start()
+        return thread
+
+    def report(self) -> str:
+        lines = [
+            f"{name}: {seconds * 1000:.1f} ms"
+            for name, seconds in sorted(
+                self.timings.items(), key=lambda item: item[1], reverse=True
+            )
+        ]
+        lines.append(f"total: {sum(self.timings.values()) * 1000:.1f} ms")
+        return "\n".join(lines)
@@ -0,0 +1,75 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class BoardFactory, which builds the boards of the
+next levels in background threads while the current one is played, so a
+level starts with a board that is already built. Boards are identified by
+their seed, so a board built ahead is the same one that would be built on
+demand.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import random
+import threading
+
+import settings
+from src.Board import Board
+from src.logic.MoveLog import level_seed
+
+# Boards kept ahead at most, the oldest one is dropped first
+MAX_PENDING = 2
+
+
+class BoardFactory:
+    def __init__(self, x: int, y: int) -> None:
+        self.x = x
+        self.y = y
+        # seed -> (thread building the board, list that receives it)
+        self.pending: Dict[int, Tuple[threading.Thread, List[Board]]] = {}
+        self.game_seed: Optional[int] = None
+
+    def prefetch(self, seed: int) -> None:
+        if seed in self.pending:
+            return
+
+        if len(self.pending) >= MAX_PENDING:
+            del self.pending[next(iter(self.pending))]
+
+        result: List[Board] = []
+        thread = threading.Thread(
+            target=lambda: result.append(Board(self.x, self.y, seed)),
+            name="board-prefetch",
+            daemon=True,
+        )
+        thread.start()
+        self.pending[seed] = (thread, result)
+
+    def take(self, seed: int) -> Board:
+        # Waits for the board if it is still being built, and builds it here
+        # if it was not asked for.
+        thread, result = self.pending.pop(seed, (None, []))
+
+        if thread is not None:
+            thread.join()
+
+        return result[0] if result else Board(self.x, self.y, seed)
+
+    def prefetch_game(self) -> None:
+        # Chooses the seed of the next game and builds its first board
+        if self.game_seed is None:
+            self.game_seed = settings.GAME_SEED
+            if self.game_seed is None:
+                self.game_seed = random.getrandbits(64)
+
+        self.prefetch(level_seed(self.game_seed, 1))
+
+    def take_game_seed(self) -> int:
+        self.prefetch_game()
+        seed = self.game_seed
+        self.game_seed = None
+        return seed
@@ -0,0 +1,149 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class Bot, which plays the game without a player. It
+posts the same key and mouse motion events a player would, so the input
+handler and the states run their usual code, and it runs the game loop
+without waiting: each frame advances several fixed logic ticks.
+"""
+
+from typing import Dict, Optional
+
+import random
+import sys
+import time
+
+import pygame
+
+from gale.input_handler import InputHandler
+from gale.timer import Timer
+
+import settings
+from src import states
+from src.DirtyRects import DirtyRects
+from src.logic.MoveIndex import Move
+from src.logic.Simulator import POLICIES
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, the peak memory is not reported there
+    resource = None
+
+
+class Bot:
+    def __init__(
+        self, policy: str = "greedy", speed: int = 8, seed: Optional[int] = None
+    ) -> None:
+        self.policy = POLICIES[policy]
+        # Logic ticks played in each frame
+        self.speed = speed
+        self.rng = random.Random(seed)
+        self.acted_state = None
+        self.moves = 0
+        self.games = 0
+
+    def __post_key(self, key: int) -> None:
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0))
+        pygame.event.post(pygame.event.Event(pygame.KEYUP, key=key, mod=0))
+
+    def __post_swap(self, state: states.PlayState, move: Move) -> None:
+        # Drags the tile at (i, j) one tile towards (i + di, j + dj), in
+        # window coordinates.
+        i, j, di, dj = move
+        scale_x = settings.WINDOW_WIDTH / settings.VIRTUAL_WIDTH
+        scale_y = settings.WINDOW_HEIGHT / settings.VIRTUAL_HEIGHT
+        x = (state.board.x + (j + 0.5) * settings.TILE_SIZE) * scale_x
+        y = (state.board.y + (i + 0.5) * settings.TILE_SIZE) * scale_y
+        pygame.event.post(
+            pygame.event.Event(
+                pygame.MOUSEMOTION,
+                pos=(int(x), int(y)),
+                rel=(
+                    int(dj * settings.TILE_SIZE * scale_x),
+                    int(di * settings.TILE_SIZE * scale_y),
+                ),
+                buttons=(1, 0, 0),
+            )
+        )
+        self.moves += 1
+
+    def act(self, state) -> None:
+        if isinstance(state, states.PlayState):
+            # A board without moves is reshuffled in the next update
+            if state.is_idle() and state.board.move_index.has_moves():
+                move = self.policy(state.board, self.rng)
+                i, j, di, dj = move
+                # The policies give each swap from its top-left tile, so a
+                # tile is dragged down or right. Randomly drag the other one.
+                if self.rng.random() < 0.5:
+                    move = (i + di, j + dj, -di, -dj)
+                self.__post_swap(state, move)
+            return
+
+        # The menus only need to be accepted once
+        if state is self.acted_state:
+            return
+
+        if isinstance(state, states.GameOverState):
+            self.games += 1
+            self.__post_key(pygame.K_RETURN)
+            self.acted_state = state
+        elif isinstance(state, states.StartState) and state.active:
+            self.__post_key(pygame.K_RETURN)
+            self.acted_state = state
+
+    def run(self, game, duration: float) -> Dict[str, float]:
+        # Plays for the given game time as fast as possible and reports the
+        # throughput.
+        screen = pygame.display.get_surface()
+        frame = pygame.Surface((settings.VIRTUAL_WIDTH, settings.VIRTUAL_HEIGHT))
+        step = 1 / settings.TICK_RATE
+        frames = 0
+        played = 0.0
+        start = time.perf_counter()
+        game.running = True
+
+        while game.running and played < duration:
+            self.act(game.state_machine.current)
+
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    game.quit()
+                else:
+                    InputHandler.handle_input(event)
+
+            for _ in range(self.speed):
+                Timer.update(step)
+                game.update(step)
+
+            # The whole frame is drawn, the changed regions are not needed
+            DirtyRects.take()
+            game.render(frame)
+            pygame.transform.scale(frame, screen.get_size(), screen)
+            pygame.display.flip()
+            frames += 1
+            played += self.speed * step
+
+        elapsed = time.perf_counter() - start
+        report = {
+            "game time": played,
+            "wall time": elapsed,
+            "games": self.games,
+            "moves": self.moves,
+            "moves/sec": self.moves / elapsed,
+            "frames/sec": frames / elapsed,
+        }
+
+        if resource is not None:
+            # Bytes on macOS, kilobytes elsewhere
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            report["peak memory (MB)"] = peak / (
+                2**20 if sys.platform == "darwin" else 2**10
+            )
+
+        return report
@@ -0,0 +1,49 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class DirtyRects, which collects the regions of the
+virtual screen that changed since the last frame.
+"""
+
+from typing import List, Optional
+
+import pygame
+
+import settings
+
+
+class DirtyRects:
+    rects: List[pygame.Rect] = []
+    full = True
+
+    @classmethod
+    def mark(cls, rect: pygame.Rect) -> None:
+        # Whole frames are drawn otherwise, and nothing would take the rects
+        if settings.DIRTY_RECT_RENDERING:
+            cls.rects.append(pygame.Rect(rect))
+
+    @classmethod
+    def mark_all(cls) -> None:
+        cls.full = True
+
+    @classmethod
+    def take(cls) -> Optional[pygame.Rect]:
+        # Returns the area to redraw, merging all the marked rects, or None if
+        # nothing changed.
+        screen = pygame.Rect(0, 0, settings.VIRTUAL_WIDTH, settings.VIRTUAL_HEIGHT)
+
+        if cls.full:
+            area = screen
+        elif cls.rects:
+            area = cls.rects[0].unionall(cls.rects[1:]).clip(screen)
+        else:
+            area = None
+
+        cls.rects = []
+        cls.full = False
+
+        return area if area is not None and area.width > 0 and area.height > 0 else None
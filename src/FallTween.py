@@ -0,0 +1,92 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class FallTween, which animates the falling tiles of a
+cascade step together. The start positions and distances of the tiles are
+kept in lists that are reused by every step, and all the tiles are moved in
+a single pass per update that builds no temporary lists.
+"""
+
+from typing import Callable, List, Optional
+
+from itertools import islice
+
+from src.logic import Piece
+
+
+class FallTween:
+    def __init__(self) -> None:
+        # Only the first count entries belong to the current fall, the rest
+        # are left from bigger steps and are overwritten later.
+        self.tiles: List[Piece] = []
+        self.start_y: List[float] = []
+        self.delta_y: List[float] = []
+        self.count = 0
+        self.duration = 0.0
+        self.elapsed = 0.0
+        self.previous_elapsed = 0.0
+        self.on_finish: Optional[Callable[[], None]] = None
+        self.active = False
+
+    def add(self, tile: Piece, start_y: float, end_y: float) -> None:
+        # Adds a tile to the next fall, it starts at start_y and ends at end_y
+        tile.y = start_y
+        k = self.count
+
+        if k < len(self.tiles):
+            self.tiles[k] = tile
+            self.start_y[k] = start_y
+            self.delta_y[k] = end_y - start_y
+        else:
+            self.tiles.append(tile)
+            self.start_y.append(start_y)
+            self.delta_y.append(end_y - start_y)
+
+        self.count += 1
+
+    def start(
+        self, duration: float, on_finish: Optional[Callable[[], None]] = None
+    ) -> None:
+        # Moves the tiles added since the last fall
+        self.duration = duration
+        self.elapsed = 0.0
+        self.previous_elapsed = 0.0
+        self.on_finish = on_finish
+        self.active = True
+
+    def __move_tiles(self, elapsed: float) -> None:
+        progress = elapsed / self.duration if self.duration > 0 else 1.0
+
+        for tile, start_y, delta_y in islice(
+            zip(self.tiles, self.start_y, self.delta_y), self.count
+        ):
+            tile.y = start_y + delta_y * progress
+
+    def interpolate(self, alpha: float) -> None:
+        # Places the tiles between the last two updates for rendering
+        if self.active:
+            self.__move_tiles(
+                self.previous_elapsed + (self.elapsed - self.previous_elapsed) * alpha
+            )
+
+    def update(self, dt: float) -> None:
+        if not self.active:
+            return
+
+        self.previous_elapsed = self.elapsed
+        self.elapsed = min(self.elapsed + dt, self.duration)
+        self.__move_tiles(self.elapsed)
+
+        if self.elapsed >= self.duration:
+            # The callback may add the tiles of the next fall
+            self.active = False
+            self.count = 0
+            on_finish = self.on_finish
+            self.on_finish = None
+
+            if on_finish is not None:
+                on_finish()
@@ -0,0 +1,81 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class FrameClock. It limits the frame rate and tells
+how many fixed logic ticks must run in each frame, so the game logic does not
+depend on the frame rate. While the game is idle it waits for events at a low
+frame rate instead.
+"""
+
+import time
+
+import pygame
+
+# Longest frame time accounted for, so a stall does not run many ticks at once
+MAX_FRAME_TIME = 0.25
+
+
+class FrameClock:
+    # Fraction of a tick elapsed since the last logic update, used to
+    # interpolate what is rendered between two ticks.
+    alpha = 0.0
+
+    def __init__(
+        self,
+        tick_rate: int,
+        max_fps: int,
+        adaptive: bool = False,
+        min_fps: int = 20,
+        idle_fps: int = 4,
+    ) -> None:
+        self.step = 1 / tick_rate
+        self.idle_fps = idle_fps
+        self.max_fps = max_fps
+        self.min_fps = min(min_fps, max_fps)
+        self.fps = max_fps
+        self.adaptive = adaptive
+        self.clock = pygame.time.Clock()
+        self.accumulator = 0.0
+        self.work_time = 0.0
+        self.frame_start = None
+
+    def __adapt(self, work_time: float) -> None:
+        # Lowers the frame rate when the frames take most of their budget and
+        # raises it back when there is room again.
+        self.work_time = self.work_time * 0.9 + work_time * 0.1
+        budget = 1 / self.fps
+
+        if self.work_time > budget * 0.9 and self.fps > self.min_fps:
+            self.fps = max(self.min_fps, self.fps - 5)
+        elif self.work_time < budget * 0.5 and self.fps < self.max_fps:
+            self.fps = min(self.max_fps, self.fps + 5)
+
+    def __wait_for_event(self) -> None:
+        # Sleeps until the next idle frame or until an event arrives, which
+        # is put back in the queue to be handled as usual.
+        event = pygame.event.wait(1000 // self.idle_fps)
+
+        if event.type != pygame.NOEVENT:
+            pygame.event.post(event)
+
+    def tick(self, idle: bool = False) -> int:
+        if idle:
+            self.__wait_for_event()
+        elif self.adaptive and self.frame_start is not None:
+            self.__adapt(time.perf_counter() - self.frame_start)
+
+        # Idle frames are expected to be long
+        limit = max(MAX_FRAME_TIME, 2 / self.idle_fps) if idle else MAX_FRAME_TIME
+        elapsed = min(self.clock.tick(self.fps) / 1000, limit)
+        self.frame_start = time.perf_counter()
+
+        self.accumulator += elapsed
+        ticks = int(self.accumulator / self.step)
+        self.accumulator -= ticks * self.step
+        FrameClock.alpha = self.accumulator / self.step
+
+        return ticks
@@ -8,32 +8,69 @@ alejandro.j.mujic4@gmail.com
 This file contains the class Match3 as a specialization of gale.Game
 """
 
+import math
+
 import pygame
 
 from gale.game import Game
-from gale.input_handler import InputData
+from gale.input_handler import InputData, InputHandler
 from gale.state import StateMachine
+from gale.timer import Timer
 
 import settings
 from src import states
+from src.BoardFactory import BoardFactory
+from src.DirtyRects import DirtyRects
+from src.FrameClock import FrameClock
+from src.logic.AnalysisWorker import AnalysisWorker
 
 
 class Match3(Game):
     def init(self) -> None:
+        def report_asset_timings():
+            if settings.PRINT_ASSET_TIMINGS:
+                print(settings.ASSETS.report())
+
+        # Only the main thread initializes SDL subsystems, the prefetch
+        # thread just loads files.
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        if not pygame.font.get_init():
+            pygame.font.init()
+
+        settings.ASSETS.prefetch(on_finish=report_asset_timings)
+        pygame.mixer.music.load(settings.MUSIC)
         pygame.mixer.music.play(loops=-1)
+        self.analysis = (
+            AnalysisWorker(
+                settings.BOARD_WIDTH,
+                settings.BOARD_HEIGHT,
+                settings.NUM_COLORS,
+                settings.NUM_VARIETIES,
+                settings.NUM_VARIETIES_POWER_UPS,
+            )
+            if settings.ANALYSIS_WORKER
+            else None
+        )
+        self.boards = BoardFactory(settings.VIRTUAL_WIDTH - 272, 16)
         self.state_machine = StateMachine(
             {
                 "start": lambda sm: states.StartState(sm, self),
-                "begin": states.BeginGameState,
-                "play": states.PlayState,
+                "begin": lambda sm: states.BeginGameState(sm, self),
+                "play": lambda sm: states.PlayState(sm, self),
                 "game-over": states.GameOverState,
             }
         )
         self.state_machine.change("start")
         self.background_x = 0
+        self.previous_background_x = 0
 
     def update(self, dt: float) -> None:
-        self.background_x -= settings.BACKGROUND_SCROLL_SPEED * dt
+        self.previous_background_x = self.background_x
+
+        # A scrolling background would make the whole screen dirty
+        if not settings.DIRTY_RECT_RENDERING:
+            self.background_x -= settings.BACKGROUND_SCROLL_SPEED * dt
 
         if self.background_x <= settings.BACKGROUND_LOOPING_POINT:
             self.background_x = 0
@@ -41,7 +78,15 @@ class Match3(Game):
         self.state_machine.update(dt)
 
     def render(self, surface: pygame.Surface) -> None:
-        surface.blit(settings.TEXTURES["background"], (self.background_x, 0))
+        background_x = self.background_x
+
+        # Interpolate between the last two ticks unless the background looped
+        if background_x <= self.previous_background_x:
+            background_x = self.previous_background_x + FrameClock.alpha * (
+                background_x - self.previous_background_x
+            )
+
+        surface.blit(settings.TEXTURES["background"], (background_x, 0))
         self.state_machine.render(surface)
 
     def on_input(self, input_id: str, input_data: InputData) -> None:
@@ -49,3 +94,87 @@ class Match3(Game):
             self.quit()
         else:
             self.state_machine.on_input(input_id, input_data)
+
+    def exec(self) -> None:
+        screen = pygame.display.get_surface()
+        frame = pygame.Surface((settings.VIRTUAL_WIDTH, settings.VIRTUAL_HEIGHT))
+        clock = FrameClock(
+            settings.TICK_RATE,
+            settings.FPS,
+            settings.ADAPTIVE_FPS,
+            settings.MIN_FPS,
+            settings.IDLE_FPS,
+        )
+        scale_x = screen.get_width() / settings.VIRTUAL_WIDTH
+        scale_y = screen.get_height() / settings.VIRTUAL_HEIGHT
+        DirtyRects.mark_all()
+
+        # Time without input, animations nor state changes
+        quiet_time = 0.0
+        state = self.state_machine.current
+
+        self.running = True
+
+        while self.running:
+            ticks = clock.tick(quiet_time >= settings.IDLE_DELAY)
+            events = pygame.event.get()
+
+            for event in events:
+                if event.type == pygame.QUIT:
+                    self.quit()
+                else:
+                    InputHandler.handle_input(event)
+
+            # The logic always advances in fixed steps. Tweens move first so
+            # the states see the final positions of the tick when they mark
+            # what changed.
+            for _ in range(ticks):
+                Timer.update(clock.step)
+                self.update(clock.step)
+
+            if (
+                events
+                or self.state_machine.current is not state
+                or not self.state_machine.current.is_idle()
+            ):
+                quiet_time = 0.0
+                state = self.state_machine.current
+            else:
+                quiet_time += ticks * clock.step
+
+            if not settings.DIRTY_RECT_RENDERING:
+                self.render(frame)
+                pygame.transform.scale(frame, screen.get_size(), screen)
+                pygame.display.flip()
+                continue
+
+            area = DirtyRects.take()
+
+            if area is None:
+                continue
+
+            frame.set_clip(area)
+            self.render(frame)
+            frame.set_clip(None)
+
+            # Scale only the dirty area to the window and present it
+            left = math.floor(area.x * scale_x)
+            top = math.floor(area.y * scale_y)
+            target = pygame.Rect(
+                left,
+                top,
+                math.ceil(area.right * scale_x) - left,
+                math.ceil(area.bottom * scale_y) - top,
+            )
+            screen.blit(
+                pygame.transform.scale(frame.subsurface(area), target.size), target
+            )
+            pygame.display.update(target)
+
+        self.close()
+
+    def close(self) -> None:
+        if self.analysis is not None:
+            self.analysis.close()
+
+        pygame.quit()
@@ -0,0 +1,75 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class SpriteCache, which builds each tile sprite with
+its shadow once and shares it among all the tiles that use it.
+"""
+
+from typing import Dict, Tuple
+
+import pygame
+
+import settings
+
+# Default shadow of the tiles on the board
+SHADOW_COLOR = (34, 32, 52, 200)
+
+# Offset of the shadow from the tile face
+SHADOW_OFFSET = 2
+
+
+class SpriteCache:
+    sprites: Dict[Tuple[str, int, int, Tuple[int, ...]], pygame.Surface] = {}
+
+    @classmethod
+    def get(
+        cls,
+        texture: str,
+        color: int,
+        variety: int,
+        shadow_color: Tuple[int, ...] = SHADOW_COLOR,
+    ) -> pygame.Surface:
+        key = (texture, color, variety, shadow_color)
+        sprite = cls.sprites.get(key)
+
+        if sprite is None:
+            sprite = cls.__build(texture, color, variety, shadow_color)
+            cls.sprites[key] = sprite
+
+        return sprite
+
+    @classmethod
+    def clear(cls) -> None:
+        cls.sprites = {}
+
+    @staticmethod
+    def __build(
+        texture: str, color: int, variety: int, shadow_color: Tuple[int, ...]
+    ) -> pygame.Surface:
+        frame = settings.FRAMES[texture][color][variety]
+
+        # The shadow is the silhouette of the tile covered by a rounded
+        # rectangle of the shadow color.
+        shadow = pygame.Surface((settings.TILE_SIZE, settings.TILE_SIZE), pygame.SRCALPHA)
+        shadow.blit(settings.TEXTURES[texture], (0, 0), frame)
+        pygame.draw.rect(
+            shadow,
+            shadow_color,
+            pygame.Rect(0, 0, settings.TILE_SIZE, settings.TILE_SIZE),
+            border_radius=7,
+        )
+
+        size = settings.TILE_SIZE + SHADOW_OFFSET
+        sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+        sprite.blit(shadow, (SHADOW_OFFSET, SHADOW_OFFSET))
+        sprite.blit(settings.TEXTURES[texture], (0, 0), frame)
+
+        # Use the pixel format of the display so blitting does not convert
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()
+
+        return sprite
@@ -0,0 +1,102 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class TextCache, which keeps the most recently used
+text surfaces so a string is rasterized only when it changes, and a
+render_text function that uses it.
+"""
+
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import pygame
+
+# Offset of the shadow from the text
+SHADOW_OFFSET = 1
+
+
+class TextCache:
+    max_size = 256
+    surfaces: "OrderedDict[Tuple, pygame.Surface]" = OrderedDict()
+
+    @classmethod
+    def get(
+        cls,
+        text: str,
+        font: pygame.font.Font,
+        color: Tuple[int, ...],
+        bgcolor: Optional[Tuple[int, ...]] = None,
+        shadowed: bool = False,
+    ) -> pygame.Surface:
+        key = (text, font, color, bgcolor, shadowed)
+        surface = cls.surfaces.get(key)
+
+        if surface is not None:
+            cls.surfaces.move_to_end(key)
+            return surface
+
+        surface = cls.__build(text, font, color, bgcolor, shadowed)
+        cls.surfaces[key] = surface
+
+        if len(cls.surfaces) > cls.max_size:
+            cls.surfaces.popitem(last=False)
+
+        return surface
+
+    @classmethod
+    def clear(cls) -> None:
+        cls.surfaces.clear()
+
+    @staticmethod
+    def __build(
+        text: str,
+        font: pygame.font.Font,
+        color: Tuple[int, ...],
+        bgcolor: Optional[Tuple[int, ...]],
+        shadowed: bool,
+    ) -> pygame.Surface:
+        text_surface = font.render(text, True, color, bgcolor)
+
+        if shadowed:
+            # The shadow and the text are composed into a single surface
+            shadow = font.render(text, True, (0, 0, 0))
+            width, height = text_surface.get_size()
+            surface = pygame.Surface(
+                (width + SHADOW_OFFSET, height + SHADOW_OFFSET), pygame.SRCALPHA
+            )
+            surface.blit(shadow, (SHADOW_OFFSET, SHADOW_OFFSET))
+            surface.blit(text_surface, (0, 0))
+        else:
+            surface = text_surface
+
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+
+        return surface
+
+
+def render_text(
+    surface: pygame.Surface,
+    text: str,
+    font: pygame.font.Font,
+    x: int,
+    y: int,
+    color: Tuple[int, ...],
+    bgcolor: Optional[Tuple[int, ...]] = None,
+    center: bool = False,
+    shadowed: bool = False,
+) -> pygame.Rect:
+    text_surface = TextCache.get(text, font, color, bgcolor, shadowed)
+
+    if center:
+        # Center the text itself, not the text with its shadow
+        offset = SHADOW_OFFSET if shadowed else 0
+        width, height = text_surface.get_size()
+        x -= (width - offset) // 2
+        y -= (height - offset) // 2
+
+    return surface.blit(text_surface, (x, y))
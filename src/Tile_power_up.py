@@ -1,34 +0,0 @@
-import pygame
-
-import settings
-
-class Tile_power_up:
-    def __init__(self, i: int, j: int, color: int, variety: int) -> None:
-        self.i = i
-        self.j = j
-        self.x = self.j * settings.TILE_SIZE
-        self.y = self.i * settings.TILE_SIZE
-        self.color = color
-        self.variety = variety # 0 or 1 
-        self.alpha_surface = pygame.Surface(
-            (settings.TILE_SIZE, settings.TILE_SIZE), pygame.SRCALPHA
-        )
-
-    def render(self, surface: pygame.Surface, offset_x: int, offset_y: int) -> None:
-        self.alpha_surface.blit(
-            settings.TEXTURES["power_ups"],
-            (0, 0),
-            settings.FRAMES["power_ups"][self.color][self.variety],
-        )
-        pygame.draw.rect(
-            self.alpha_surface,
-            (34, 32, 52, 200),
-            pygame.Rect(0, 0, settings.TILE_SIZE, settings.TILE_SIZE),
-            border_radius=7,
-        )
-        surface.blit(self.alpha_surface, (self.x + 2 + offset_x, self.y + 2 + offset_y))
-        surface.blit(
-            settings.TEXTURES["power_ups"],
-            (self.x + offset_x, self.y + offset_y),
-            settings.FRAMES["power_ups"][self.color][self.variety],
-        )
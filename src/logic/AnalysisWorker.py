@@ -0,0 +1,186 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class AnalysisWorker, which analyzes boards in another
+process: legal moves, a hint from the Solver and the number of tiles of each
+color. The board is sent as a snapshot of its colors, varieties and kinds in
+shared memory, and the results are picked up later without blocking. Every
+snapshot has a version, and results of a version older than the last one
+are dropped.
+"""
+
+from typing import Any, List, Optional
+
+import multiprocessing
+import queue
+import struct
+from multiprocessing import shared_memory
+
+from src.logic.BoardLogic import BoardLogic
+from src.logic.MoveIndex import Move
+from src.logic.Solver import Solver
+
+# Version of the snapshot stored before the cells
+VERSION = struct.Struct("<Q")
+
+# Seconds given to the worker to stop before it is terminated
+JOIN_TIMEOUT = 1.0
+
+
+class Analysis:
+    def __init__(
+        self, version: int, moves: int, hint: Optional[Move], color_counts: List[int]
+    ) -> None:
+        self.version = version
+        self.moves = moves
+        self.hint = hint
+        self.color_counts = color_counts
+
+
+def _analyze(
+    memory_name: str,
+    width: int,
+    height: int,
+    num_colors: int,
+    num_varieties: int,
+    num_varieties_power_ups: int,
+    time_budget: float,
+    lock: Any,
+    requests: Any,
+    results: Any,
+) -> None:
+    memory = shared_memory.SharedMemory(name=memory_name)
+    cells = width * height
+    board = BoardLogic(
+        width, height, num_colors, num_varieties, num_varieties_power_ups
+    )
+    solver = Solver(time_budget=time_budget)
+
+    try:
+        while True:
+            request = requests.get()
+
+            # Only the latest snapshot matters, skip the requests behind it
+            try:
+                while request is not None:
+                    request = requests.get_nowait()
+            except queue.Empty:
+                pass
+
+            if request is None:
+                break
+
+            with lock:
+                (version,) = VERSION.unpack_from(memory.buf)
+                data = bytes(memory.buf[VERSION.size : VERSION.size + 3 * cells])
+
+            board.set_cells(
+                *(
+                    [data[k + i * width : k + (i + 1) * width] for i in range(height)]
+                    for k in (0, cells, 2 * cells)
+                )
+            )
+            moves = board.move_index.all_moves()
+            results.put(
+                Analysis(
+                    version,
+                    len(moves),
+                    solver.best_move(board) if moves else None,
+                    [len(color) for color in board.color_cells],
+                )
+            )
+    finally:
+        memory.close()
+
+
+class AnalysisWorker:
+    def __init__(
+        self,
+        width: int = 8,
+        height: int = 8,
+        num_colors: int = 18,
+        num_varieties: int = 6,
+        num_varieties_power_ups: int = 2,
+        time_budget: float = 0.5,
+    ) -> None:
+        self.width = width
+        self.height = height
+        self.memory = shared_memory.SharedMemory(
+            create=True, size=VERSION.size + 3 * width * height
+        )
+        # Spawned, so the worker does not inherit the window nor the threads
+        # of the game.
+        context = multiprocessing.get_context("spawn")
+        self.lock = context.Lock()
+        self.requests = context.Queue()
+        self.results = context.Queue()
+        self.version = 0
+        self.latest: Optional[Analysis] = None
+        self.process = context.Process(
+            target=_analyze,
+            args=(
+                self.memory.name,
+                width,
+                height,
+                num_colors,
+                num_varieties,
+                num_varieties_power_ups,
+                time_budget,
+                self.lock,
+                self.requests,
+                self.results,
+            ),
+            daemon=True,
+        )
+        self.process.start()
+
+    def submit(self, board: BoardLogic) -> int:
+        # Writes a snapshot of the board and asks for its analysis
+        self.version += 1
+        self.latest = None
+        data = bytearray(3 * self.width * self.height)
+
+        for offset, attribute in enumerate(("color", "variety", "kind")):
+            k = offset * self.width * self.height
+            for row in board.tiles:
+                for tile in row:
+                    data[k] = getattr(tile, attribute)
+                    k += 1
+
+        with self.lock:
+            VERSION.pack_into(self.memory.buf, 0, self.version)
+            self.memory.buf[VERSION.size : VERSION.size + len(data)] = data
+
+        self.requests.put(self.version)
+        return self.version
+
+    def invalidate(self) -> None:
+        # The board changed, the analysis of the last snapshot is stale
+        self.version += 1
+        self.latest = None
+
+    def poll(self) -> Optional[Analysis]:
+        # Returns the analysis of the current snapshot once it is ready
+        try:
+            while True:
+                analysis = self.results.get_nowait()
+                if analysis.version == self.version:
+                    self.latest = analysis
+        except queue.Empty:
+            pass
+
+        return self.latest
+
+    def close(self) -> None:
+        self.requests.put(None)
+        self.process.join(JOIN_TIMEOUT)
+
+        if self.process.is_alive():
+            self.process.terminate()
+
+        self.memory.close()
+        self.memory.unlink()
@@ -0,0 +1,95 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the match, legal-move and gravity queries on boards
+stored as NumPy arrays of colors. They work on whole arrays, so a stack of
+boards is handled in one call.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from src.logic.MoveIndex import LINE_PAIRS
+
+# Color value of an empty cell
+EMPTY = -1
+
+
+def _shifted(padded: np.ndarray, di: int, dj: int, h: int, w: int) -> np.ndarray:
+    # View where result[..., i, j] is the cell (i + di, j + dj) of the
+    # original array. The padding of 3 cells holds EMPTY.
+    return padded[..., 3 + di : 3 + di + h, 3 + dj : 3 + dj + w]
+
+
+def match_mask(colors: np.ndarray) -> np.ndarray:
+    # Works on the last two axes, so a stack of boards is checked at once.
+    mask = np.zeros(colors.shape, dtype=bool)
+
+    left, mid, right = colors[..., :, :-2], colors[..., :, 1:-1], colors[..., :, 2:]
+    h = (left == mid) & (mid == right) & (left != EMPTY)
+    mask[..., :, :-2] |= h
+    mask[..., :, 1:-1] |= h
+    mask[..., :, 2:] |= h
+
+    top, mid, bottom = colors[..., :-2, :], colors[..., 1:-1, :], colors[..., 2:, :]
+    v = (top == mid) & (mid == bottom) & (top != EMPTY)
+    mask[..., :-2, :] |= v
+    mask[..., 1:-1, :] |= v
+    mask[..., 2:, :] |= v
+
+    return mask
+
+
+def _moved_color_matches(
+    colors: np.ndarray, padded: np.ndarray, di: int, dj: int
+) -> np.ndarray:
+    # result[..., i, j] is True when the color at (i, j) moved to
+    # (i + di, j + dj) completes a line there. Pairs that include the source
+    # cell are skipped because after a swap it holds the other color.
+    h, w = colors.shape[-2:]
+    result = np.zeros(colors.shape, dtype=bool)
+
+    for (ai, aj), (bi, bj) in LINE_PAIRS:
+        if (ai, aj) == (-di, -dj) or (bi, bj) == (-di, -dj):
+            continue
+        a = _shifted(padded, di + ai, dj + aj, h, w)
+        b = _shifted(padded, di + bi, dj + bj, h, w)
+        result |= (a == colors) & (b == colors)
+
+    return result & (colors != EMPTY)
+
+
+def legal_swaps(colors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Returns two masks: horizontal[..., i, j] for the swap (i, j)-(i, j + 1)
+    # and vertical[..., i, j] for the swap (i, j)-(i + 1, j).
+    pad = [(0, 0)] * (colors.ndim - 2) + [(3, 3), (3, 3)]
+    padded = np.pad(colors, pad, constant_values=EMPTY)
+
+    right = _moved_color_matches(colors, padded, 0, 1)
+    left = _moved_color_matches(colors, padded, 0, -1)
+    down = _moved_color_matches(colors, padded, 1, 0)
+    up = _moved_color_matches(colors, padded, -1, 0)
+
+    different_h = colors[..., :, :-1] != colors[..., :, 1:]
+    horizontal = different_h & (right[..., :, :-1] | left[..., :, 1:])
+
+    different_v = colors[..., :-1, :] != colors[..., 1:, :]
+    vertical = different_v & (down[..., :-1, :] | up[..., 1:, :])
+
+    return horizontal, vertical
+
+
+def collapse(colors: np.ndarray, *others: np.ndarray) -> np.ndarray:
+    # Moves every non-empty cell to the bottom of its column keeping their
+    # relative order. Returns, for each cell, the row it came from.
+    order = np.argsort(colors != EMPTY, axis=-2, kind="stable")
+
+    for array in (colors,) + others:
+        array[...] = np.take_along_axis(array, order, axis=-2)
+
+    return order
@@ -0,0 +1,431 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class BatchEnv, an environment in the style of Gym
+that plays many boards at once to train and evaluate move policies. The
+boards are stacked in NumPy arrays and every rule of BoardLogic is applied
+to all of them together: matches, power-ups and their shapes, chained
+power-up clears, gravity and refill. Each step plays one swap per board,
+resolves the whole cascades and returns the score of each one.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from src.logic.ArrayBoard import EMPTY, collapse, legal_swaps, match_mask
+from src.logic.BoardLogic import MATCH_TILE_SCORE
+
+# Value of power_ups for a regular tile. Power-ups hold their variety: 0
+# clears the row and the column, 1 clears every tile of the color.
+NO_POWER_UP = -1
+
+# A value greater than any cell priority or index
+NONE = np.iinfo(np.int32).max
+
+# Tries to reshuffle a board without moves before filling it again
+MAX_SHUFFLES = 16
+
+
+def _run_lengths(colors: np.ndarray, axis: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Length of the run of equal colors through each cell along the axis (1
+    # for rows, 2 for columns) and the position of the cell in it.
+    lines = np.moveaxis(colors, axis, -1)
+    n = lines.shape[-1]
+    same = np.zeros(lines.shape, dtype=bool)
+    same[..., 1:] = (lines[..., 1:] == lines[..., :-1]) & (lines[..., 1:] != EMPTY)
+    before = np.zeros(lines.shape, dtype=np.int8)
+    after = np.zeros(lines.shape, dtype=np.int8)
+
+    for k in range(1, n):
+        before[..., k] = (before[..., k - 1] + 1) * same[..., k]
+        after[..., n - 1 - k] = (after[..., n - k] + 1) * same[..., n - k]
+
+    length = before + after + 1
+    return np.moveaxis(length, -1, axis), np.moveaxis(before, -1, axis)
+
+
+def _spread_min(values: np.ndarray, joined: np.ndarray, axis: int) -> None:
+    # Gives every cell the minimum of the cells joined to it along the axis,
+    # joined[..., k] meaning that k is joined to k - 1.
+    lines = np.moveaxis(values, axis, -1)
+    links = np.moveaxis(joined, axis, -1)
+    n = lines.shape[-1]
+
+    for k in range(1, n):
+        np.minimum(
+            lines[..., k],
+            np.where(links[..., k], lines[..., k - 1], NONE),
+            out=lines[..., k],
+        )
+
+    for k in range(n - 2, -1, -1):
+        np.minimum(
+            lines[..., k],
+            np.where(links[..., k + 1], lines[..., k + 1], NONE),
+            out=lines[..., k],
+        )
+
+
+class BatchEnv:
+    def __init__(
+        self,
+        num_envs: int,
+        width: int = 8,
+        height: int = 8,
+        num_colors: int = 18,
+        num_varieties_power_ups: int = 2,
+        max_steps: int = 100,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.num_envs = num_envs
+        self.width = width
+        self.height = height
+        self.num_colors = num_colors
+        self.num_varieties_power_ups = num_varieties_power_ups
+        # Moves of an episode, after them the board starts again
+        self.max_steps = max_steps
+        self.rng = np.random.default_rng(seed)
+        shape = (num_envs, height, width)
+        self.colors = np.full(shape, EMPTY, dtype=np.int8)
+        self.power_ups = np.full(shape, NO_POWER_UP, dtype=np.int8)
+        self.steps = np.zeros(num_envs, dtype=np.int32)
+
+        # Swaps are numbered as the horizontal ones (i, j)-(i, j + 1) row by
+        # row, followed by the vertical ones (i, j)-(i + 1, j).
+        horizontal = height * (width - 1)
+        self.num_actions = horizontal + (height - 1) * width
+        actions = np.arange(self.num_actions)
+        vertical = actions >= horizontal
+        i = np.where(vertical, (actions - horizontal) // width, actions // (width - 1))
+        j = np.where(vertical, (actions - horizontal) % width, actions % (width - 1))
+        self.action_cells = (
+            i * width + j,
+            np.where(vertical, (i + 1) * width + j, i * width + j + 1),
+        )
+        # Legal swaps of each board, kept up to date as the boards change
+        self.masks = np.zeros((num_envs, self.num_actions), dtype=bool)
+
+        cells = np.arange(height * width).reshape(height, width)
+        self.cells = np.broadcast_to(cells, shape)
+        self.rows = np.broadcast_to(cells // width, shape)
+        self.columns = np.broadcast_to(cells % width, shape)
+
+    def observation(self) -> np.ndarray:
+        # One value per tile, as the keys of Zobrist: the color and, for
+        # power-ups, which one.
+        return self.colors.astype(np.int16) * (1 + self.num_varieties_power_ups) + (
+            self.power_ups + 1
+        )
+
+    def action_masks(self) -> np.ndarray:
+        return self.masks
+
+    def __update_masks(self, envs: np.ndarray) -> np.ndarray:
+        # Returns which of the boards have a legal swap
+        horizontal, vertical = legal_swaps(self.colors[envs])
+        masks = np.concatenate(
+            (horizontal.reshape(len(envs), -1), vertical.reshape(len(envs), -1)),
+            axis=1,
+        )
+        self.masks[envs] = masks
+        return masks.any(axis=1)
+
+    def __fill(self, envs: np.ndarray) -> None:
+        # Random tiles without matches and with at least one move, the
+        # matched tiles are drawn again until there are none.
+        pending = envs
+
+        while len(pending) > 0:
+            colors = self.rng.integers(
+                0, self.num_colors, (len(pending), self.height, self.width)
+            ).astype(np.int8)
+            matched = match_mask(colors)
+
+            while matched.any():
+                colors[matched] = self.rng.integers(
+                    0, self.num_colors, int(matched.sum())
+                )
+                matched = match_mask(colors)
+
+            self.colors[pending] = colors
+            self.power_ups[pending] = NO_POWER_UP
+            pending = pending[~self.__update_masks(pending)]
+
+    def __shuffle(self, envs: np.ndarray) -> None:
+        # As randomize_board, the tiles of boards without moves are moved
+        # around until there is a move and no match. Boards that do not get
+        # there are filled again.
+        pending = envs
+
+        for _ in range(MAX_SHUFFLES):
+            if len(pending) == 0:
+                return
+
+            order = np.argsort(
+                self.rng.random((len(pending), self.height * self.width)), axis=1
+            )
+            for array in (self.colors, self.power_ups):
+                flat = array[pending].reshape(len(pending), -1)
+                array[pending] = np.take_along_axis(flat, order, axis=1).reshape(
+                    -1, self.height, self.width
+                )
+
+            ready = self.__update_masks(pending) & ~match_mask(
+                self.colors[pending]
+            ).any(axis=(1, 2))
+            pending = pending[~ready]
+
+        self.__fill(pending)
+
+    def reset(self, envs: Optional[np.ndarray] = None) -> np.ndarray:
+        envs = np.arange(self.num_envs) if envs is None else envs
+        self.__fill(envs)
+        self.steps[envs] = 0
+        return self.observation()
+
+    def __power_ups(
+        self,
+        colors: np.ndarray,
+        moved: np.ndarray,
+        h_length: np.ndarray,
+        h_position: np.ndarray,
+        v_length: np.ndarray,
+        v_position: np.ndarray,
+        h_run: np.ndarray,
+        v_run: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # The power-ups earned by the match groups, as calculate_power_ups.
+        # Returns the board, cell and variety of each one.
+        n = len(colors)
+        size = self.height * self.width
+        matched = h_run | v_run
+
+        # Tiles are grouped through the runs they share, every tile of a
+        # group ends up with the smallest cell of the group.
+        group = np.where(matched, self.cells[:n], NONE).astype(np.int32)
+        h_joined = np.zeros(colors.shape, dtype=bool)
+        h_joined[..., 1:] = h_run[..., 1:] & (h_position[..., 1:] > 0)
+        v_joined = np.zeros(colors.shape, dtype=bool)
+        v_joined[..., 1:, :] = v_run[..., 1:, :] & (v_position[..., 1:, :] > 0)
+
+        while True:
+            previous = group.copy()
+            _spread_min(group, h_joined, 2)
+            _spread_min(group, v_joined, 1)
+            if np.array_equal(group, previous):
+                break
+
+        boards = np.broadcast_to(np.arange(n)[:, None, None], colors.shape)
+        keys = (boards * size + group)[matched]
+
+        # Longest run of each group
+        length = np.maximum(np.where(h_run, h_length, 0), np.where(v_run, v_length, 0))
+        longest = np.zeros(n * size, dtype=np.int32)
+        np.maximum.at(longest, keys, length[matched])
+
+        # Crossing with the most inner tiles, then the greatest cell
+        crossing = h_run & v_run
+        inner = ((h_position > 0) & (h_position < h_length - 1)).astype(np.int32) + (
+            (v_position > 0) & (v_position < v_length - 1)
+        )
+        pivot = np.full(n * size, -1, dtype=np.int32)
+        np.maximum.at(
+            pivot,
+            (boards * size + group)[crossing],
+            (inner * size + self.cells[:n])[crossing],
+        )
+
+        # Anchor on the longest run: the first moved tile in it, or else its
+        # middle tile.
+        group_longest = longest[boards * size + np.minimum(group, size - 1)]
+        on_h = h_run & (h_length == group_longest)
+        on_v = v_run & (v_length == group_longest)
+        on_longest = matched & (on_h | on_v)
+        first_moved = np.full(n * size, NONE, dtype=np.int64)
+        np.minimum.at(
+            first_moved,
+            (boards * size + group)[on_longest & (moved < NONE)],
+            (moved.astype(np.int64) * size + self.cells[:n])[
+                on_longest & (moved < NONE)
+            ],
+        )
+        middle = on_longest & (
+            (on_h & (h_position == h_length // 2))
+            | (on_v & (v_position == v_length // 2))
+        )
+        middle_cell = np.full(n * size, NONE, dtype=np.int32)
+        np.minimum.at(
+            middle_cell, (boards * size + group)[middle], self.cells[:n][middle]
+        )
+        anchor = np.where(first_moved < NONE, first_moved % size, middle_cell)
+
+        # One power-up per group, decided by its shape
+        roots = np.flatnonzero((matched & (group == self.cells[:n])).reshape(-1))
+        longest, pivot = longest[roots], pivot[roots]
+        variety = np.where(
+            longest >= 5, 1, np.where((pivot >= 0) | (longest == 4), 0, -1)
+        )
+        cell = np.where((longest < 5) & (pivot >= 0), pivot % size, anchor[roots])
+        earned = (variety >= 0) & (variety < self.num_varieties_power_ups)
+
+        return roots[earned] // size, cell[earned], variety[earned]
+
+    def __resolve(self, envs: np.ndarray, moved: np.ndarray) -> np.ndarray:
+        # Resolves the cascades of the given boards, moved holding for each
+        # cell the order in which resolve_step would visit it if it moved, or
+        # NONE. Returns the score of each board.
+        scores = np.zeros(len(envs), dtype=np.int64)
+        active = np.arange(len(envs))
+        size = self.height * self.width
+        cross_score = 8 * (self.width + self.height) + 50
+
+        while len(active) > 0:
+            boards = envs[active]
+            colors = self.colors[boards]
+            power_ups = self.power_ups[boards]
+            h_length, h_position = _run_lengths(colors, 2)
+            v_length, v_position = _run_lengths(colors, 1)
+            h_run = (h_length >= 3) & (colors != EMPTY)
+            v_run = (v_length >= 3) & (colors != EMPTY)
+            matched = h_run | v_run
+            has_matches = matched.any(axis=(1, 2))
+
+            if not has_matches.all():
+                keep = np.flatnonzero(has_matches)
+                active, boards, colors, power_ups = (
+                    active[keep],
+                    boards[keep],
+                    colors[keep],
+                    power_ups[keep],
+                )
+                moved = moved[keep]
+                h_length, h_position = h_length[keep], h_position[keep]
+                v_length, v_position = v_length[keep], v_position[keep]
+                h_run, v_run, matched = h_run[keep], v_run[keep], matched[keep]
+
+            if len(active) == 0:
+                break
+
+            n = len(active)
+            score = matched.sum(axis=(1, 2)) * MATCH_TILE_SCORE
+
+            # Only lines of four or more and crossing lines earn power-ups
+            shaped = (h_run & (h_length >= 4)) | (v_run & (v_length >= 4))
+            shaped = np.flatnonzero((shaped | (h_run & v_run)).any(axis=(1, 2)))
+            board, cell, variety = self.__power_ups(
+                colors[shaped],
+                moved[shaped],
+                h_length[shaped],
+                h_position[shaped],
+                v_length[shaped],
+                v_position[shaped],
+                h_run[shaped],
+                v_run[shaped],
+            )
+            board = shaped[board]
+            cell_i, cell_j = cell // self.width, cell % self.width
+            group_colors = colors[board, cell_i, cell_j]
+            cleared = matched
+            used = np.zeros(colors.shape, dtype=bool)
+
+            while True:
+                triggered = cleared & (power_ups != NO_POWER_UP) & ~used
+
+                if not triggered.any():
+                    break
+
+                used |= triggered
+                cross = triggered & (power_ups == 0)
+                rows = cross.any(axis=2)
+                columns = cross.any(axis=1)
+                score += cross.sum(axis=(1, 2)) * cross_score
+
+                cleared = cleared | rows[:, :, None] | columns[:, None, :]
+
+                # A color is cleared with every tile it has on the board
+                hit_boards, hit_i, hit_j = np.nonzero(triggered & (power_ups == 1))
+                hit_colors = colors[hit_boards, hit_i, hit_j]
+                for k in range(len(hit_boards)):
+                    same_color = colors[hit_boards[k]] == hit_colors[k]
+                    score[hit_boards[k]] += 16 * int(same_color.sum()) + 50
+                    cleared[hit_boards[k]] |= same_color
+
+            colors[cleared] = EMPTY
+            power_ups[cleared] = NO_POWER_UP
+
+            # The power-ups appear where the groups were, before gravity
+            colors[board, cell_i, cell_j] = group_colors
+            power_ups[board, cell_i, cell_j] = variety
+
+            # The tiles that fell come first, column by column from the
+            # bottom, then the new ones column by column from the top.
+            origin = collapse(colors, power_ups)
+            empty = colors == EMPTY
+            fell = (origin != self.rows[:n]) & ~empty
+            moved = np.full(colors.shape, NONE, dtype=np.int32)
+            moved[fell] = (
+                self.columns[:n] * self.height + (self.height - 1 - self.rows[:n])
+            )[fell]
+            moved[empty] = (size + self.columns[:n] * self.height + self.rows[:n])[
+                empty
+            ]
+
+            colors[empty] = self.rng.integers(0, self.num_colors, int(empty.sum()))
+            power_ups[empty] = NO_POWER_UP
+
+            self.colors[boards] = colors
+            self.power_ups[boards] = power_ups
+            scores[active] += score
+
+        return scores
+
+    def step(
+        self, actions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        # Plays one swap on each board. A swap that does not match is undone
+        # and scores nothing, as in PlayState. Boards left without moves are
+        # reshuffled, and boards that played max_steps moves start again.
+        envs = np.arange(self.num_envs)
+        legal = self.masks[envs, actions]
+        first, second = self.action_cells[0][actions], self.action_cells[1][actions]
+
+        played = envs[legal]
+        first, second = first[legal], second[legal]
+        for array in (self.colors, self.power_ups):
+            flat = array.reshape(self.num_envs, -1)
+            flat[played, first], flat[played, second] = (
+                flat[played, second],
+                flat[played, first],
+            )
+
+        # resolve_cascade is given the tile moved to the first cell, then
+        # the other one.
+        moved = np.full((len(played), self.height * self.width), NONE, dtype=np.int32)
+        moved[np.arange(len(played)), first] = 0
+        moved[np.arange(len(played)), second] = 1
+
+        rewards = np.zeros(self.num_envs, dtype=np.int64)
+        rewards[played] = self.__resolve(
+            played, moved.reshape(-1, self.height, self.width)
+        )
+
+        # Only the boards that played changed
+        stuck = played[~self.__update_masks(played)]
+        self.__shuffle(stuck)
+
+        self.steps += 1
+        dones = self.steps >= self.max_steps
+        if dones.any():
+            self.reset(envs[dones])
+
+        return (
+            self.observation(),
+            rewards,
+            dones,
+            {"legal": legal, "reshuffled": np.isin(envs, stuck)},
+        )
@@ -0,0 +1,608 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class BoardLogic with the rules of the board: tile
+generation, swaps, match finding, power-ups, gravity, refill and scoring.
+It does not depend on pygame nor on the game settings, so it can be used to
+simulate games without a window.
+"""
+
+from typing import List, Optional, Tuple, Any, Deque, Dict, Iterable, Sequence, Set
+
+import random
+from itertools import islice
+from collections import defaultdict, deque
+
+from src.logic.Cascade import Cascade, CascadeStep
+from src.logic.MatchGroup import (
+    CROSS,
+    L_SHAPE,
+    LINE4,
+    LINE5,
+    T_SHAPE,
+    MatchGroup,
+    find_match_groups,
+    run_cells,
+)
+from src.logic.MoveIndex import LINE_PAIRS, Cell, MoveIndex
+from src.logic.Piece import KIND_POWER_UP, KIND_TILE, Piece
+from src.logic.Zobrist import zobrist_key
+
+# Points given by each tile of a match
+MATCH_TILE_SCORE = 50
+
+# Variety of the power-up earned by each shape of match: 0 clears the row and
+# the column, 1 clears every tile of the color.
+POWER_UP_SHAPES = {
+    LINE4: 0,
+    L_SHAPE: 0,
+    T_SHAPE: 0,
+    CROSS: 0,
+    LINE5: 1,
+}
+
+# Random tries to find a color that fits a cell before falling back to a
+# slower but exhaustive choice
+MAX_TRIES = 16
+
+# Cells are filled row by row, so only the pair to the left, the pair above
+# and the cells of the move pattern can forbid colors, and the pattern only
+# forbids its own color. With more colors than that a cell always has one.
+MIN_COLORS = 4
+
+
+class BoardLogic:
+    def __init__(
+        self,
+        width: int = 8,
+        height: int = 8,
+        num_colors: int = 18,
+        num_varieties: int = 6,
+        num_varieties_power_ups: int = 2,
+        tile_size: int = 32,
+        seed: Optional[int] = None,
+    ) -> None:
+        if num_colors < MIN_COLORS:
+            raise ValueError(f"a board needs at least {MIN_COLORS} colors")
+
+        # Every random choice of the board comes from its own stream, so a
+        # board built with the same seed and moves evolves the same way.
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.width = width
+        self.height = height
+        self.num_colors = num_colors
+        self.num_varieties = num_varieties
+        self.num_varieties_power_ups = num_varieties_power_ups
+        self.tile_size = tile_size
+        self.matches: List[MatchGroup] = []
+        self.tiles: List[List[Piece]] = []
+        # Cells of each color and cells holding a power-up. They are kept up
+        # to date by __set_tile.
+        self.color_cells: List[Set[Cell]] = []
+        self.power_up_cells: Set[Cell] = set()
+        # Zobrist hash of the tiles on the board, also kept by __set_tile
+        self.hash = 0
+        # Removed tiles ready to be reused
+        self.free_tiles: List[Piece] = []
+        self.move_index = MoveIndex(self.width, self.height, self.__color_at)
+        self.__initialize_tiles()
+        self.band_moving = False ##True indica cuando buscar matches
+        self.score_power_up = 0
+
+    def create_tile(
+        self, i: int, j: int, color: int, variety: int, kind: int = KIND_TILE
+    ) -> Piece:
+        return Piece(i, j, color, variety, self.tile_size, kind)
+
+    def __take_tile(
+        self, i: int, j: int, color: int, variety: int, kind: int = KIND_TILE
+    ) -> Piece:
+        # Reuses a recycled tile when there is one
+        if self.free_tiles:
+            tile = self.free_tiles.pop()
+            tile.reset(i, j, color, variety, self.tile_size, kind)
+            return tile
+
+        return self.create_tile(i, j, color, variety, kind)
+
+    def recycle(self, tiles: Iterable[Piece]) -> None:
+        # Tiles that left the board go back to the pool, which holds at most
+        # a board full of them.
+        room = self.width * self.height - len(self.free_tiles)
+        self.free_tiles.extend(islice(tiles, max(room, 0)))
+
+    def __zobrist_key(self, i: int, j: int, tile: Piece) -> int:
+        # Regular tiles of the same color play the same, their variety only
+        # changes how they look.
+        key = tile.color * (1 + self.num_varieties_power_ups)
+        if tile.kind == KIND_POWER_UP:
+            key += 1 + tile.variety
+        return zobrist_key(i * self.width + j, key)
+
+    def __set_tile(self, i: int, j: int, tile: Optional[Piece]) -> None:
+        old_tile = self.tiles[i][j]
+
+        if old_tile is not None:
+            self.color_cells[old_tile.color].discard((i, j))
+            if old_tile.kind == KIND_POWER_UP:
+                self.power_up_cells.discard((i, j))
+            self.hash ^= self.__zobrist_key(i, j, old_tile)
+
+        self.tiles[i][j] = tile
+
+        if tile is not None:
+            self.color_cells[tile.color].add((i, j))
+            if tile.kind == KIND_POWER_UP:
+                self.power_up_cells.add((i, j))
+            self.hash ^= self.__zobrist_key(i, j, tile)
+
+    def __index_tiles(self) -> None:
+        self.color_cells = [set() for _ in range(self.num_colors)]
+        self.power_up_cells = set()
+        self.hash = 0
+
+        for row in self.tiles:
+            for tile in row:
+                if tile is not None:
+                    self.color_cells[tile.color].add((tile.i, tile.j))
+                    if tile.kind == KIND_POWER_UP:
+                        self.power_up_cells.add((tile.i, tile.j))
+                    self.hash ^= self.__zobrist_key(tile.i, tile.j, tile)
+
+    def clone(self, seed: Optional[int] = None) -> "BoardLogic":
+        # A logic-only copy of the board with its own random stream, used to
+        # try moves without touching this board.
+        board = BoardLogic.__new__(BoardLogic)
+        board.seed = seed
+        board.rng = random.Random(seed)
+        board.width = self.width
+        board.height = self.height
+        board.num_colors = self.num_colors
+        board.num_varieties = self.num_varieties
+        board.num_varieties_power_ups = self.num_varieties_power_ups
+        board.tile_size = self.tile_size
+        board.matches = []
+        board.tiles = [
+            [
+                None
+                if tile is None
+                else Piece(
+                    tile.i, tile.j, tile.color, tile.variety, self.tile_size, tile.kind
+                )
+                for tile in row
+            ]
+            for row in self.tiles
+        ]
+        board.color_cells = [set(cells) for cells in self.color_cells]
+        board.power_up_cells = set(self.power_up_cells)
+        board.hash = self.hash
+        board.free_tiles = []
+        board.move_index = MoveIndex(board.width, board.height, board.__color_at)
+        board.move_index.moves = set(self.move_index.moves)
+        board.band_moving = False
+        board.score_power_up = 0
+        return board
+
+    def set_cells(
+        self,
+        colors: Sequence[Sequence[int]],
+        varieties: Sequence[Sequence[int]],
+        kinds: Sequence[Sequence[int]],
+    ) -> None:
+        # Replaces the tiles by the given rows of values, as taken from a
+        # snapshot of another board of the same size.
+        self.recycle(tile for row in self.tiles for tile in row if tile is not None)
+        self.tiles = [
+            [
+                self.__take_tile(i, j, colors[i][j], varieties[i][j], kinds[i][j])
+                for j in range(self.width)
+            ]
+            for i in range(self.height)
+        ]
+        self.matches = []
+        self.__index_tiles()
+        self.move_index.rebuild()
+
+    def __color_at(self, i: int, j: int) -> Optional[int]:
+        if 0 <= i < self.height and 0 <= j < self.width:
+            tile = self.tiles[i][j]
+            if tile is not None:
+                return tile.color
+        return None
+
+    def __forbidden_colors(
+        self, grid: List[List[Optional[Piece]]], i: int, j: int
+    ) -> Set[int]:
+        # Colors that would complete a line with the tiles already placed
+        # around (i, j).
+        forbidden = set()
+
+        for (ai, aj), (bi, bj) in LINE_PAIRS:
+            if not (
+                0 <= i + ai < self.height
+                and 0 <= j + aj < self.width
+                and 0 <= i + bi < self.height
+                and 0 <= j + bj < self.width
+            ):
+                continue
+            a = grid[i + ai][j + aj]
+            b = grid[i + bi][j + bj]
+            if a is not None and b is not None and a.color == b.color:
+                forbidden.add(a.color)
+
+        return forbidden
+
+    def __move_pattern(self) -> Optional[Tuple[List[Tuple[int, int]], Tuple[int, int]]]:
+        # Three cells that get the same color and a blocked cell that must not
+        # have it. Swapping the blocked cell with the third cell completes a
+        # line, so the board has at least one legal move.
+        if self.width >= 3 and self.height >= 2:
+            i = self.rng.randint(0, self.height - 2)
+            j = self.rng.randint(0, self.width - 3)
+            return [(i, j), (i, j + 1), (i + 1, j + 2)], (i, j + 2)
+
+        if self.height >= 3 and self.width >= 2:
+            i = self.rng.randint(0, self.height - 3)
+            j = self.rng.randint(0, self.width - 2)
+            return [(i, j), (i + 1, j), (i + 2, j + 1)], (i + 2, j)
+
+        return None
+
+    def __random_color(self, forbidden: Set[int]) -> int:
+        # At most MIN_COLORS - 1 colors are forbidden, so a few random tries
+        # are enough unless there are very few colors.
+        for _ in range(MAX_TRIES):
+            color = self.rng.randrange(self.num_colors)
+            if color not in forbidden:
+                return color
+
+        return self.rng.choice(
+            [c for c in range(self.num_colors) if c not in forbidden]
+        )
+
+    def __take_from_queue(self, queue: Deque[Piece], forbidden: Set[int]) -> Piece:
+        # Takes the next tile whose color fits. Tiles that do not fit go to
+        # the back of the queue, and after a few tries the tile is painted.
+        for _ in range(MAX_TRIES):
+            tile = queue.popleft()
+            if tile.color not in forbidden:
+                return tile
+            queue.append(tile)
+
+        tile = queue.popleft()
+        tile.color = self.__random_color(forbidden)
+        return tile
+
+    def __place_built(
+        self, grid: List[List[Optional[Piece]]], tile: Piece, i: int, j: int
+    ) -> None:
+        tile.i = i
+        tile.j = j
+        tile.x = j * self.tile_size
+        tile.y = i * self.tile_size
+        grid[i][j] = tile
+
+    def __build_tiles(self, tiles: Optional[List[Piece]] = None) -> None:
+        # Builds a board without matches and with at least one legal move. If
+        # tiles are given they are rearranged, otherwise new ones are created.
+        # Every cell is visited once and does a bounded number of tries, so it
+        # takes O(width * height) in the worst case.
+        grid: List[List[Optional[Piece]]] = [
+            [None for _ in range(self.width)] for _ in range(self.height)
+        ]
+        pattern = self.__move_pattern()
+        blocked = None
+        pattern_color = None
+        queue: Optional[Deque[Piece]] = None
+
+        if pattern is not None:
+            cells, blocked = pattern
+
+        if tiles is not None:
+            pattern_tiles: List[Piece] = []
+
+            if pattern is not None:
+                by_color: Dict[int, List[Piece]] = defaultdict(list)
+                for tile in tiles:
+                    by_color[tile.color].append(tile)
+                candidates = [c for c, l in by_color.items() if len(l) >= 3]
+                pattern_color = (
+                    self.rng.choice(candidates)
+                    if candidates
+                    else max(by_color, key=lambda c: len(by_color[c]))
+                )
+                pattern_tiles = self.rng.sample(
+                    by_color[pattern_color], min(3, len(by_color[pattern_color]))
+                )
+
+            chosen = set(pattern_tiles)
+            rest = [tile for tile in tiles if tile not in chosen]
+            self.rng.shuffle(rest)
+            queue = deque(rest)
+
+            if pattern is not None:
+                for k, (i, j) in enumerate(cells):
+                    if k < len(pattern_tiles):
+                        tile = pattern_tiles[k]
+                    else:
+                        # Not enough tiles of a single color, paint one
+                        tile = queue.popleft()
+                        tile.color = pattern_color
+                    self.__place_built(grid, tile, i, j)
+        elif pattern is not None:
+            pattern_color = self.rng.randrange(self.num_colors)
+            for i, j in cells:
+                grid[i][j] = self.__take_tile(
+                    i, j, pattern_color, self.rng.randint(0, self.num_varieties - 1)
+                )
+
+        for i in range(self.height):
+            for j in range(self.width):
+                if grid[i][j] is not None:
+                    continue
+
+                forbidden = self.__forbidden_colors(grid, i, j)
+
+                if (i, j) == blocked:
+                    forbidden.add(pattern_color)
+
+                if queue is None:
+                    grid[i][j] = self.__take_tile(
+                        i,
+                        j,
+                        self.__random_color(forbidden),
+                        self.rng.randint(0, self.num_varieties - 1),
+                    )
+                else:
+                    self.__place_built(
+                        grid, self.__take_from_queue(queue, forbidden), i, j
+                    )
+
+        self.tiles = grid
+        self.__index_tiles()
+        self.move_index.rebuild()
+
+    def __initialize_tiles(self) -> None:
+        self.__build_tiles()
+
+    def calculate_matches_for(
+        self, new_tiles: List[Piece]
+    ) -> Optional[List[MatchGroup]]:
+        # Adds the groups of matched tiles that include the given tiles
+        self.matches.extend(
+            find_match_groups(self.tiles, [(tile.i, tile.j) for tile in new_tiles])
+        )
+
+        return self.matches if len(self.matches) > 0 else None
+
+    def remove_matches(self) -> List[Piece]:
+        # Computes every cell to clear at once: the matched tiles, the cells
+        # reached by the power-ups among them, and so on for the power-ups
+        # reached. Returns the tiles removed.
+        self.score_power_up = 0
+        cleared: Set[Cell] = set()
+        pending: List[Cell] = []
+
+        def clear(cell: Cell) -> None:
+            if cell not in cleared:
+                cleared.add(cell)
+                if cell in self.power_up_cells:
+                    pending.append(cell)
+
+        for match in self.matches:
+            for tile in match:
+                clear((tile.i, tile.j))
+
+        while pending:
+            i, j = pending.pop()
+            variety = self.tiles[i][j].variety
+
+            if variety == 0:
+                cells = self.__power_up_cross(i, j)
+            elif variety == 1:
+                cells = self.__power_up_miscellaneous(i, j)
+            else:
+                cells = []
+
+            for cell in cells:
+                clear(cell)
+
+        removed: List[Piece] = []
+
+        for i, j in cleared:
+            tile = self.tiles[i][j]
+            if tile is not None:
+                removed.append(tile)
+                self.__set_tile(i, j, None)
+
+        self.matches = []
+        return removed
+
+    def apply_gravity(
+        self,
+    ) -> Tuple[List[Tuple[Piece, int, int]], List[Tuple[Piece, int]]]:
+        # Lets the tiles fall and fills the holes with new tiles. Returns each
+        # tile that fell with its previous and new row, and each new tile with
+        # its row.
+        falls: List[Tuple[Piece, int, int]] = []
+        spawns: List[Tuple[Piece, int]] = []
+
+        # Lowest changed row of each column
+        changed: Dict[int, int] = {}
+
+        for j in range(self.width):
+            # Go up the column moving each tile down to the lowest free row
+            free_i = self.height - 1
+
+            for i in range(self.height - 1, -1, -1):
+                tile = self.tiles[i][j]
+
+                if tile is None:
+                    continue
+
+                if i != free_i:
+                    self.__set_tile(free_i, j, tile)
+                    self.__set_tile(i, j, None)
+                    tile.i = free_i
+                    falls.append((tile, i, free_i))
+                    changed.setdefault(j, free_i)
+
+                free_i -= 1
+
+            # create replacement tiles at the top of the screen
+            for i in range(free_i + 1):
+                tile = self.__take_tile(
+                    i,
+                    j,
+                    self.rng.randint(0, self.num_colors - 1),
+                    self.rng.randint(0, self.num_varieties - 1),
+                )
+                tile.y -= self.tile_size
+                self.__set_tile(i, j, tile)
+                spawns.append((tile, i))
+                changed[j] = max(changed.get(j, -1), i)
+
+        # Only the top of each changed column is different
+        self.move_index.refresh_columns(changed)
+
+        return falls, spawns
+
+    def get_falling_tiles(self) -> List[Tuple[Piece, Dict[str, Any]]]:
+        # List of tweens to create
+        falls, spawns = self.apply_gravity()
+        tweens: List[Tuple[Piece, Dict[str, Any]]] = [
+            (tile, {"y": i * self.tile_size}) for tile, _, i in falls
+        ]
+        tweens.extend((tile, {"y": i * self.tile_size}) for tile, i in spawns)
+        return tweens
+
+    def randomize_board(self) -> None:
+        self.__build_tiles([tile for row in self.tiles for tile in row])
+
+    def swap_tiles(self, tile1: Piece, tile2: Piece) -> None:
+        i1, j1, i2, j2 = tile1.i, tile1.j, tile2.i, tile2.j
+        self.__set_tile(i1, j1, tile2)
+        self.__set_tile(i2, j2, tile1)
+        (tile1.i, tile1.j, tile2.i, tile2.j) = (i2, j2, i1, j1)
+        self.move_index.refresh([(i1, j1), (i2, j2)])
+
+    def place_tile(self, tile: Piece) -> None:
+        self.__set_tile(tile.i, tile.j, tile)
+        self.move_index.refresh([(tile.i, tile.j)])
+
+    def remove_tile(self, i: int, j: int) -> Optional[Piece]:
+        tile = self.tiles[i][j]
+        self.__set_tile(i, j, None)
+        self.move_index.refresh([(i, j)])
+        return tile
+
+    def is_match_board(self) -> bool:
+        self.matches = []
+        return self.move_index.has_moves()
+
+    def is_valid_swap(self, i1: int, j1: int, i2: int, j2: int) -> bool:
+        if (i1, j1) > (i2, j2):
+            i1, j1, i2, j2 = i2, j2, i1, j1
+        return (i1, j1, i2 - i1, j2 - j1) in self.move_index.moves
+
+    def resolve_step(self, tiles: List[Piece]) -> Optional[CascadeStep]:
+        # Performs one step of a cascade: finds the matches produced by the
+        # given tiles, scores them, removes them, places the power-up they
+        # generate and lets the tiles fall. Returns None if there was no
+        # match.
+        self.matches = []
+        matches = self.calculate_matches_for(tiles)
+
+        if matches is None:
+            return None
+
+        tile_power_ups = self.calculate_power_ups(tiles)
+
+        score = sum(len(match) * MATCH_TILE_SCORE for match in matches)
+        removed = self.remove_matches()
+        score += self.score_power_up
+        power_ups = []
+
+        for tile_power_up in tile_power_ups:
+            self.place_tile(tile_power_up)
+            power_ups.append((tile_power_up, tile_power_up.i))
+
+        falls, spawns = self.apply_gravity()
+
+        return CascadeStep(score, removed, power_ups, falls, spawns)
+
+    def resolve_cascade(self, tiles: List[Piece], recycle: bool = False) -> Cascade:
+        # Resolves the whole cascade at once, leaving the board in its final
+        # state. The steps of the returned cascade can be played back later,
+        # and then their removed tiles must be recycled by the caller. When
+        # nothing is played back they can be recycled right away.
+        cascade = Cascade()
+        step = self.resolve_step(tiles)
+
+        while step is not None:
+            cascade.add(step)
+            if recycle:
+                self.recycle(step.removed)
+            step = self.resolve_step(
+                [tile for tile, _, _ in step.falls] + [tile for tile, _ in step.spawns]
+            )
+
+        return cascade
+
+    def resolve(self, tiles: List[Piece]) -> Tuple[int, int]:
+        # Returns the total score and the number of steps of the cascade
+        cascade = self.resolve_cascade(tiles, recycle=True)
+        return cascade.score, cascade.depth
+    
+    def __power_up_anchor(self, group: MatchGroup, moved: List[Cell]) -> Cell:
+        # Crossing runs use the shared cell. Lines use the moved tile that
+        # formed them, or the middle of the line when there is none.
+        if group.pivot is not None:
+            return group.pivot
+
+        run = max(group.runs, key=lambda run: run[4])
+        cells = run_cells(run)
+
+        for cell in moved:
+            if cell in cells:
+                return cell
+
+        return cells[len(cells) // 2]
+
+    def calculate_power_ups(self, tiles: List[Piece]) -> List[Piece]:
+        # Every match group with a shape that earns a power-up gets one, the
+        # given tiles are the ones that moved to form the matches.
+        moved = [(tile.i, tile.j) for tile in tiles]
+        power_ups = []
+
+        for group in self.matches:
+            variety = POWER_UP_SHAPES.get(group.shape)
+
+            if variety is None or variety >= self.num_varieties_power_ups:
+                continue
+
+            i, j = self.__power_up_anchor(group, moved)
+            power_ups.append(
+                self.__take_tile(i, j, group.color, variety, KIND_POWER_UP)
+            )
+
+        return power_ups
+
+    def __power_up_cross(self, tile_i: int, tile_j: int) -> List[Cell]:
+        self.score_power_up += 8 * (self.width + self.height) + 50
+
+        return [(tile_i, j) for j in range(self.width)] + [
+            (i, tile_j) for i in range(self.height)
+        ]
+
+    def __power_up_miscellaneous(self, i: int, j: int) -> List[Cell]:
+        # Only the tiles of the color are visited
+        cells = list(self.color_cells[self.tiles[i][j].color])
+        # 16 for each tile cleared and 50 for using the power-up
+        self.score_power_up += 16 * len(cells) + 50
+        return cells
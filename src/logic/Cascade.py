@@ -0,0 +1,48 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the classes Cascade and CascadeStep, the timeline of a
+cascade resolved at once. Each step tells which tiles vanish, which power-ups
+are placed and which tiles fall or spawn, so it can be played back later.
+"""
+
+from typing import List, Tuple
+
+from src.logic.Piece import Piece
+
+
+class CascadeStep:
+    def __init__(
+        self,
+        score: int,
+        removed: List[Piece],
+        power_ups: List[Tuple[Piece, int]],
+        falls: List[Tuple[Piece, int, int]],
+        spawns: List[Tuple[Piece, int]],
+    ) -> None:
+        self.score = score
+        self.removed = removed
+        # Each power-up placed with its row
+        self.power_ups = power_ups
+        # Each tile that fell with the row it left and the row it reached
+        self.falls = falls
+        # Each new tile with its row, it enters from the row above
+        self.spawns = spawns
+
+
+class Cascade:
+    def __init__(self) -> None:
+        self.score = 0
+        self.steps: List[CascadeStep] = []
+
+    def add(self, step: CascadeStep) -> None:
+        self.steps.append(step)
+        self.score += step.score
+
+    @property
+    def depth(self) -> int:
+        return len(self.steps)
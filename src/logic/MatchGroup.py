@@ -0,0 +1,195 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class MatchGroup and the function find_match_groups.
+Runs of three or more tiles of the same color are found around the given
+cells, and runs that share a tile are joined with a union-find into groups
+whose shape is classified.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.logic.MoveIndex import Cell
+from src.logic.Piece import Piece
+
+# A run is (i, j, di, dj, length): it starts at (i, j) and goes along
+# (di, dj), which is (0, 1) or (1, 0).
+Run = Tuple[int, int, int, int, int]
+
+LINE3 = "line3"
+LINE4 = "line4"
+LINE5 = "line5"
+L_SHAPE = "L"
+T_SHAPE = "T"
+CROSS = "cross"
+
+
+class MatchGroup:
+    def __init__(
+        self,
+        tiles: List[Piece],
+        runs: List[Run],
+        shape: str,
+        pivot: Optional[Cell] = None,
+    ) -> None:
+        self.tiles = tiles
+        self.runs = runs
+        self.shape = shape
+        # Cell shared by two crossing runs, if any
+        self.pivot = pivot
+        self.color = tiles[0].color
+
+    def __len__(self) -> int:
+        return len(self.tiles)
+
+    def __iter__(self) -> Iterator[Piece]:
+        return iter(self.tiles)
+
+
+def run_cells(run: Run) -> List[Cell]:
+    i, j, di, dj, length = run
+    return [(i + k * di, j + k * dj) for k in range(length)]
+
+
+def _runs_through(tiles: List[List[Optional[Piece]]], i: int, j: int) -> List[Run]:
+    # The horizontal and vertical runs of three or more through (i, j)
+    tile = tiles[i][j]
+
+    if tile is None:
+        return []
+
+    height = len(tiles)
+    width = len(tiles[0])
+    color = tile.color
+    runs = []
+
+    for di, dj in ((0, 1), (1, 0)):
+        start_i, start_j = i, j
+        while (
+            0 <= start_i - di
+            and 0 <= start_j - dj
+            and tiles[start_i - di][start_j - dj] is not None
+            and tiles[start_i - di][start_j - dj].color == color
+        ):
+            start_i -= di
+            start_j -= dj
+
+        end_i, end_j = i, j
+        while (
+            end_i + di < height
+            and end_j + dj < width
+            and tiles[end_i + di][end_j + dj] is not None
+            and tiles[end_i + di][end_j + dj].color == color
+        ):
+            end_i += di
+            end_j += dj
+
+        length = end_i - start_i + end_j - start_j + 1
+
+        if length >= 3:
+            runs.append((start_i, start_j, di, dj, length))
+
+    return runs
+
+
+def _crossing_shape(run1: Run, run2: Run, cell: Cell) -> str:
+    # Two runs cross at cell, which is an end or an inner tile of each one
+    inner = 0
+
+    for i, j, di, dj, length in (run1, run2):
+        k = (cell[0] - i) * di + (cell[1] - j) * dj
+        if 0 < k < length - 1:
+            inner += 1
+
+    return (L_SHAPE, T_SHAPE, CROSS)[inner]
+
+
+def _classify(
+    runs: List[Run], crossings: List[Tuple[Run, Run, Cell]]
+) -> Tuple[str, Optional[Cell]]:
+    longest = max(run[4] for run in runs)
+
+    if longest >= 5:
+        return LINE5, None
+
+    if crossings:
+        # The crossing with the most inner tiles gives the shape
+        order = (L_SHAPE, T_SHAPE, CROSS)
+        shape, cell = max(
+            ((_crossing_shape(r1, r2, cell), cell) for r1, r2, cell in crossings),
+            key=lambda item: (order.index(item[0]), item[1]),
+        )
+        return shape, cell
+
+    return (LINE4 if longest == 4 else LINE3), None
+
+
+def find_match_groups(
+    tiles: List[List[Optional[Piece]]], cells: Iterable[Cell]
+) -> List[MatchGroup]:
+    # Visits only the runs reachable from the given cells, so the time is
+    # linear in the number of matched tiles.
+    run_ids: Dict[Run, int] = {}
+    runs: List[Run] = []
+    parent: List[int] = []
+    cell_runs: Dict[Cell, List[int]] = {}
+    pending = list(cells)
+    visited = set()
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    while pending:
+        cell = pending.pop()
+
+        if cell in visited:
+            continue
+        visited.add(cell)
+
+        for run in _runs_through(tiles, *cell):
+            if run in run_ids:
+                continue
+            run_ids[run] = len(runs)
+            runs.append(run)
+            parent.append(run_ids[run])
+
+            for run_cell in run_cells(run):
+                cell_runs.setdefault(run_cell, []).append(run_ids[run])
+                pending.append(run_cell)
+
+    # A tile is in at most one run per direction, so shared tiles join two
+    crossings: List[Tuple[int, int, Cell]] = []
+
+    for cell, ids in cell_runs.items():
+        if len(ids) == 2:
+            a, b = find(ids[0]), find(ids[1])
+            if a != b:
+                parent[a] = b
+            crossings.append((ids[0], ids[1], cell))
+
+    members: Dict[int, List[Run]] = {}
+    group_crossings: Dict[int, List[Tuple[Run, Run, Cell]]] = {}
+
+    for run_id, run in enumerate(runs):
+        members.setdefault(find(run_id), []).append(run)
+
+    for a, b, cell in crossings:
+        group_crossings.setdefault(find(a), []).append((runs[a], runs[b], cell))
+
+    groups = []
+
+    for root, group_runs in members.items():
+        group_cells = sorted({cell for run in group_runs for cell in run_cells(run)})
+        shape, pivot = _classify(group_runs, group_crossings.get(root, []))
+        groups.append(
+            MatchGroup([tiles[i][j] for i, j in group_cells], group_runs, shape, pivot)
+        )
+
+    return groups
@@ -0,0 +1,142 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class MoveIndex, which keeps the set of legal swaps of
+a board up to date by re-evaluating only the neighbourhood of changed cells.
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+Cell = Tuple[int, int]
+
+# A move is (i, j, di, dj): the tile at (i, j) is swapped with the tile at
+# (i + di, j + dj), with (di, dj) being (0, 1) or (1, 0).
+Move = Tuple[int, int, int, int]
+
+DIRECTIONS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+# The six pairs of cells (relative to a target cell) that complete a line of
+# three together with the target cell.
+LINE_PAIRS = (
+    ((0, -2), (0, -1)),
+    ((0, 1), (0, 2)),
+    ((0, -1), (0, 1)),
+    ((-2, 0), (-1, 0)),
+    ((1, 0), (2, 0)),
+    ((-1, 0), (1, 0)),
+)
+
+
+def _build_match_patterns() -> Dict[Cell, Tuple[Tuple[Cell, Cell], ...]]:
+    # For a tile moving by (di, dj), the pairs of cells (relative to its
+    # source cell) that must have its color so that it completes a line of
+    # three. Pairs that contain the source cell are discarded because after
+    # the swap it holds the other tile.
+    patterns = {}
+
+    for di, dj in DIRECTIONS:
+        patterns[(di, dj)] = tuple(
+            ((di + ai, dj + aj), (di + bi, dj + bj))
+            for (ai, aj), (bi, bj) in LINE_PAIRS
+            if (ai, aj) != (-di, -dj) and (bi, bj) != (-di, -dj)
+        )
+
+    return patterns
+
+
+MATCH_PATTERNS = _build_match_patterns()
+
+# Anchors (relative to a changed cell) of the swaps whose legality may depend
+# on that cell.
+AFFECTED_MOVES = tuple(
+    (di, dj, 0, 1) for di in range(-2, 3) for dj in range(-3, 3)
+) + tuple((di, dj, 1, 0) for di in range(-3, 3) for dj in range(-2, 3))
+
+
+class MoveIndex:
+    def __init__(
+        self, width: int, height: int, color_at: Callable[[int, int], Optional[int]]
+    ) -> None:
+        self.width = width
+        self.height = height
+        self.color_at = color_at
+        self.moves: Set[Move] = set()
+
+    def __completes_line(self, i: int, j: int, di: int, dj: int, color: int) -> bool:
+        color_at = self.color_at
+
+        for (ai, aj), (bi, bj) in MATCH_PATTERNS[(di, dj)]:
+            if color_at(i + ai, j + aj) == color and color_at(i + bi, j + bj) == color:
+                return True
+
+        return False
+
+    def __is_legal(self, move: Move) -> bool:
+        i, j, di, dj = move
+        color1 = self.color_at(i, j)
+        color2 = self.color_at(i + di, j + dj)
+
+        if color1 is None or color2 is None or color1 == color2:
+            return False
+
+        return self.__completes_line(i, j, di, dj, color1) or self.__completes_line(
+            i + di, j + dj, -di, -dj, color2
+        )
+
+    def __evaluate(self, move: Move) -> None:
+        if self.__is_legal(move):
+            self.moves.add(move)
+        else:
+            self.moves.discard(move)
+
+    def rebuild(self) -> None:
+        self.moves = set()
+
+        for i in range(self.height):
+            for j in range(self.width):
+                if j < self.width - 1:
+                    self.__evaluate((i, j, 0, 1))
+                if i < self.height - 1:
+                    self.__evaluate((i, j, 1, 0))
+
+    def refresh(self, cells: Iterable[Cell]) -> None:
+        candidates: Set[Move] = set()
+
+        for i, j in cells:
+            for oi, oj, di, dj in AFFECTED_MOVES:
+                mi, mj = i + oi, j + oj
+                if (
+                    0 <= mi < self.height - di
+                    and 0 <= mj < self.width - dj
+                ):
+                    candidates.add((mi, mj, di, dj))
+
+        for move in candidates:
+            self.__evaluate(move)
+
+    def refresh_columns(self, changed: Dict[int, int]) -> None:
+        # Refreshes after gravity, where each changed column j is different
+        # from row 0 down to row changed[j]. The swaps that depend on those
+        # cells are anchored up to two rows below and three columns around.
+        lowest: Dict[int, int] = {}
+
+        for j, bottom in changed.items():
+            for mj in range(max(0, j - 3), min(self.width, j + 3)):
+                lowest[mj] = max(lowest.get(mj, -1), bottom + 2)
+
+        for mj, bottom in lowest.items():
+            for mi in range(min(bottom, self.height - 1) + 1):
+                if mj < self.width - 1:
+                    self.__evaluate((mi, mj, 0, 1))
+                if mi < self.height - 1:
+                    self.__evaluate((mi, mj, 1, 0))
+
+    def has_moves(self) -> bool:
+        return len(self.moves) > 0
+
+    def all_moves(self) -> List[Move]:
+        return sorted(self.moves)
@@ -0,0 +1,121 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class MoveLog, the record of a game: its seed, the
+swaps played with the time they were made and the final score. It is stored
+as a small binary file.
+"""
+
+from typing import List, Tuple
+
+import struct
+
+MAGIC = b"M3LG"
+VERSION = 2
+
+# magic, version, width, height, colors, varieties, seed, score, steps of the
+# last move that were scored (0 for all of them), number of moves
+HEADER = struct.Struct("<4sBHHHHQqII")
+
+# seconds since the level started, i, j, direction
+MOVE = struct.Struct("<fHHB")
+
+# Directions as numbered by PlayState: up, down, left, right
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+# (time, i, j, direction)
+LoggedMove = Tuple[float, int, int, int]
+
+
+def level_seed(seed: int, level: int) -> int:
+    # Seed of the board of each level, derived from the seed of the game
+    return (seed + level * 0x9E3779B97F4A7C15) % 2**64
+
+
+class MoveLog:
+    def __init__(
+        self,
+        seed: int,
+        width: int = 8,
+        height: int = 8,
+        num_colors: int = 18,
+        num_varieties: int = 6,
+    ) -> None:
+        # Stored as 64 unsigned bits. Boards only use the seed modulo 2**64,
+        # so a negative seed gives the same game.
+        self.seed = seed & (2**64 - 1)
+        self.width = width
+        self.height = height
+        self.num_colors = num_colors
+        self.num_varieties = num_varieties
+        self.moves: List[LoggedMove] = []
+        self.score = 0
+        # A game may end in the middle of the cascade of its last move
+        self.last_steps = 0
+
+    def record(self, time: float, i: int, j: int, direction: int) -> None:
+        self.moves.append((time, i, j, direction))
+
+    def finish(self, score: int, last_steps: int = 0) -> None:
+        self.score = score
+        self.last_steps = last_steps
+
+    def to_bytes(self) -> bytes:
+        data = bytearray(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                self.width,
+                self.height,
+                self.num_colors,
+                self.num_varieties,
+                self.seed,
+                self.score,
+                self.last_steps,
+                len(self.moves),
+            )
+        )
+
+        for move in self.moves:
+            data += MOVE.pack(*move)
+
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "MoveLog":
+        (
+            magic,
+            version,
+            width,
+            height,
+            num_colors,
+            num_varieties,
+            seed,
+            score,
+            last_steps,
+            count,
+        ) = HEADER.unpack_from(data)
+
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a move log of this version")
+
+        log = cls(seed, width, height, num_colors, num_varieties)
+        log.finish(score, last_steps)
+        end = HEADER.size + count * MOVE.size
+        log.moves = list(MOVE.iter_unpack(data[HEADER.size : end]))
+        return log
+
+    def save(self, path: str, exclusive: bool = False) -> None:
+        # An exclusive save fails with FileExistsError instead of replacing
+        # an existing file
+        with open(path, "xb" if exclusive else "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "MoveLog":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
@@ -0,0 +1,46 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class Piece, the logical representation of a tile.
+Regular tiles and power-ups are told apart by their kind.
+"""
+
+KIND_TILE = 0
+# variety 0 clears a row and a column, variety 1 clears a color
+KIND_POWER_UP = 1
+
+
+class Piece:
+    __slots__ = ("i", "j", "x", "y", "color", "variety", "kind")
+
+    def __init__(
+        self,
+        i: int,
+        j: int,
+        color: int,
+        variety: int,
+        tile_size: int = 32,
+        kind: int = KIND_TILE,
+    ) -> None:
+        self.reset(i, j, color, variety, tile_size, kind)
+
+    def reset(
+        self,
+        i: int,
+        j: int,
+        color: int,
+        variety: int,
+        tile_size: int = 32,
+        kind: int = KIND_TILE,
+    ) -> None:
+        self.i = i
+        self.j = j
+        self.x = self.j * tile_size
+        self.y = self.i * tile_size
+        self.color = color
+        self.variety = variety
+        self.kind = kind
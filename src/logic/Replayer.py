@@ -0,0 +1,69 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class Replayer, which plays a MoveLog again without
+animations, following the same rules as PlayState.
+"""
+
+from src.logic.BoardLogic import BoardLogic
+from src.logic.MoveLog import DIRECTIONS, MoveLog, level_seed
+from src.logic.Simulator import goal_score
+
+
+class Replayer:
+    def __init__(self, log: MoveLog) -> None:
+        self.log = log
+        self.level = 1
+        self.score = 0
+        # Board of the level being played, as it was after the last move
+        self.board = self.__new_board()
+
+    def __new_board(self) -> BoardLogic:
+        return BoardLogic(
+            self.log.width,
+            self.log.height,
+            self.log.num_colors,
+            self.log.num_varieties,
+            seed=level_seed(self.log.seed, self.level),
+        )
+
+    def run(self) -> int:
+        board = self.board
+        last = len(self.log.moves) - 1
+
+        for k, (_, i, j, direction) in enumerate(self.log.moves):
+            di, dj = DIRECTIONS[direction]
+
+            if not board.is_valid_swap(i, j, i + di, j + dj):
+                raise ValueError(f"move {k} ({i}, {j}, {direction}) is not legal")
+
+            tile1 = board.tiles[i][j]
+            tile2 = board.tiles[i + di][j + dj]
+            board.swap_tiles(tile1, tile2)
+            cascade = board.resolve_cascade([tile2, tile1], recycle=True)
+
+            steps = cascade.steps
+            if k == last and self.log.last_steps > 0:
+                steps = steps[: self.log.last_steps]
+
+            # PlayState moves to the next level as soon as the goal is reached,
+            # even in the middle of a cascade.
+            goal = goal_score(self.level)
+
+            for step in steps:
+                self.score += step.score
+                if self.score >= goal:
+                    break
+
+            if self.score >= goal:
+                self.level += 1
+                board = self.__new_board()
+                self.board = board
+            elif not board.is_match_board():
+                board.randomize_board()
+
+        return self.score
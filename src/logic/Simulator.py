@@ -0,0 +1,161 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class Simulator, which plays whole games without
+animations using a move policy and a simulated clock.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+import math
+import random
+
+from src.logic.BoardLogic import BoardLogic
+from src.logic.MoveIndex import Move
+from src.logic.Solver import Solver
+
+# Durations (in seconds) of the animations of PlayState
+SWAP_TIME = 0.25
+FALL_TIME = 0.5
+
+LEVEL_TIME = 60
+
+
+def goal_score(level: int) -> float:
+    # Same goal as PlayState
+    return level * 1.25 * 1000
+
+
+def random_policy(board: BoardLogic, rng: random.Random) -> Move:
+    return rng.choice(board.move_index.all_moves())
+
+
+def first_policy(board: BoardLogic, rng: random.Random) -> Move:
+    return board.move_index.all_moves()[0]
+
+
+def greedy_policy(board: BoardLogic, rng: random.Random) -> Move:
+    # Picks the swap that matches more tiles right away, without looking at
+    # the cascade.
+    best_moves: List[Move] = []
+    best_count = 0
+
+    for move in board.move_index.all_moves():
+        i, j, di, dj = move
+        tile1 = board.tiles[i][j]
+        tile2 = board.tiles[i + di][j + dj]
+        board.swap_tiles(tile1, tile2)
+        board.matches = []
+        matches = board.calculate_matches_for([tile1, tile2]) or []
+        count = sum(len(match) for match in matches)
+        board.matches = []
+        board.swap_tiles(tile1, tile2)
+
+        if count > best_count:
+            best_moves = [move]
+            best_count = count
+        elif count == best_count:
+            best_moves.append(move)
+
+    return rng.choice(best_moves)
+
+
+def solver_policy(board: BoardLogic, rng: random.Random) -> Move:
+    # Without a time budget, so the games do not depend on the machine
+    solver = Solver(
+        max_depth=1, samples=2, time_budget=math.inf, seed=rng.getrandbits(64)
+    )
+    return solver.best_move(board)
+
+
+POLICIES: Dict[str, Callable[[BoardLogic, random.Random], Move]] = {
+    "random": random_policy,
+    "first": first_policy,
+    "greedy": greedy_policy,
+    "solver": solver_policy,
+}
+
+
+class Simulator:
+    def __init__(
+        self,
+        width: int = 8,
+        height: int = 8,
+        num_colors: int = 18,
+        policy: str = "random",
+        think_time: float = 0.5,
+        level_time: float = LEVEL_TIME,
+        max_levels: int = 20,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.width = width
+        self.height = height
+        self.num_colors = num_colors
+        self.policy = POLICIES[policy]
+        self.think_time = think_time
+        self.level_time = level_time
+        self.max_levels = max_levels
+        self.rng = random.Random(seed)
+
+    def __play_level(self, level: int, score: int) -> Dict[str, Any]:
+        board = BoardLogic(
+            self.width, self.height, self.num_colors, seed=self.rng.getrandbits(64)
+        )
+        goal = goal_score(level)
+        start_score = score
+        clock = 0.0
+        moves = 0
+        cascades: List[int] = []
+
+        while clock < self.level_time and score < goal:
+            i, j, di, dj = self.policy(board, self.rng)
+            tile1 = board.tiles[i][j]
+            tile2 = board.tiles[i + di][j + dj]
+            board.swap_tiles(tile1, tile2)
+
+            gained, depth = board.resolve([tile1, tile2])
+            score += gained
+            moves += 1
+            cascades.append(depth)
+            clock += self.think_time + SWAP_TIME + depth * FALL_TIME
+
+            if not board.is_match_board():
+                board.randomize_board()
+
+        elapsed = min(clock, self.level_time)
+
+        return {
+            "level": level,
+            "cleared": score >= goal,
+            "score": score - start_score,
+            "time": elapsed,
+            "score_per_second": (score - start_score) / elapsed if elapsed > 0 else 0,
+            "moves": moves,
+            "cascades": cascades,
+        }
+
+    def play_game(self) -> Dict[str, Any]:
+        # Levels are played in a row keeping the score, as in the game, until
+        # one of them is not cleared in time.
+        levels = []
+        score = 0
+
+        for level in range(1, self.max_levels + 1):
+            result = self.__play_level(level, score)
+            levels.append(result)
+            score += result["score"]
+
+            if not result["cleared"]:
+                break
+
+        return {
+            "width": self.width,
+            "height": self.height,
+            "num_colors": self.num_colors,
+            "score": score,
+            "levels": levels,
+        }
@@ -0,0 +1,132 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the class Solver, which ranks the legal swaps of a board
+by the score they are expected to give within the next moves. Cascades are
+resolved on copies of the board and the random refills are sampled, so the
+value of a move is the average over the samples of its score plus the best
+value reachable afterwards. Positions already evaluated are kept in a
+transposition table keyed by the hash of the board.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import random
+import time
+
+from src.logic.BoardLogic import MATCH_TILE_SCORE, BoardLogic
+from src.logic.MoveIndex import Move
+
+# Entries of the transposition table kept between searches
+MAX_TABLE_SIZE = 100_000
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class Solver:
+    def __init__(
+        self,
+        max_depth: int = 2,
+        samples: int = 3,
+        time_budget: float = 0.1,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.max_depth = max_depth
+        self.samples = samples
+        self.time_budget = time_budget
+        self.rng = random.Random(seed)
+        # (board hash, depth) -> best expected score
+        self.table: Dict[Tuple[int, int], float] = {}
+        self.deadline = 0.0
+        # Depth reached by the last ranking
+        self.depth = 0
+
+    def __check_time(self) -> None:
+        if time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+    def __immediate_score(self, board: BoardLogic, move: Move) -> float:
+        # Score of the first matches of the move, without resolving it
+        i, j, di, dj = move
+        tile1 = board.tiles[i][j]
+        tile2 = board.tiles[i + di][j + dj]
+        board.swap_tiles(tile1, tile2)
+        board.matches = []
+        matches = board.calculate_matches_for([tile1, tile2]) or []
+        board.matches = []
+        board.swap_tiles(tile1, tile2)
+        return sum(len(match) for match in matches) * MATCH_TILE_SCORE
+
+    def __expected_score(self, board: BoardLogic, move: Move, depth: int) -> float:
+        # Average over sampled refills of the score of the move plus the best
+        # value of the position it leaves.
+        i, j, di, dj = move
+        total = 0.0
+
+        for _ in range(self.samples):
+            self.__check_time()
+            sample = board.clone(self.rng.getrandbits(64))
+            tile1 = sample.tiles[i][j]
+            tile2 = sample.tiles[i + di][j + dj]
+            sample.swap_tiles(tile1, tile2)
+            score, _ = sample.resolve([tile1, tile2])
+
+            if not sample.is_match_board():
+                sample.randomize_board()
+
+            total += score + self.__best_value(sample, depth - 1)
+
+        return total / self.samples
+
+    def __best_value(self, board: BoardLogic, depth: int) -> float:
+        if depth == 0:
+            return 0.0
+
+        key = (board.hash, depth)
+        value = self.table.get(key)
+
+        if value is None:
+            value = max(
+                (
+                    self.__expected_score(board, move, depth)
+                    for move in board.move_index.all_moves()
+                ),
+                default=0.0,
+            )
+            self.table[key] = value
+
+        return value
+
+    def rank_moves(self, board: BoardLogic) -> List[Tuple[Move, float]]:
+        # Deepens the search one move at a time while there is time left and
+        # keeps the ranking of the deepest search that was completed. The
+        # first ranking only looks at the first matches of each move, so
+        # there is always one.
+        self.deadline = time.perf_counter() + self.time_budget
+        if len(self.table) > MAX_TABLE_SIZE:
+            self.table.clear()
+
+        moves = board.move_index.all_moves()
+        values = {move: self.__immediate_score(board, move) for move in moves}
+        self.depth = 0
+
+        try:
+            for depth in range(1, self.max_depth + 1):
+                values = {
+                    move: self.__expected_score(board, move, depth) for move in moves
+                }
+                self.depth = depth
+        except SearchTimeout:
+            pass
+
+        return sorted(values.items(), key=lambda item: (-item[1], item[0]))
+
+    def best_move(self, board: BoardLogic) -> Optional[Move]:
+        ranking = self.rank_moves(board)
+        return ranking[0][0] if ranking else None
@@ -0,0 +1,26 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the Zobrist keys used to hash boards incrementally. The
+hash of a board is the xor of the key of every tile, so changing a cell only
+takes two xors.
+"""
+
+# Fixed, so equal boards have equal hashes in every run
+SEED = 0x5EED
+
+MASK = 2**64 - 1
+
+
+def zobrist_key(cell: int, key: int) -> int:
+    # The key is mixed from the cell and the key number with the splitmix64
+    # finalizer instead of being stored, so no table grows with the board.
+    # Every step is a bijection, so different pairs get different keys.
+    z = (((cell << 32) | key) * 0x9E3779B97F4A7C15 + SEED) & MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK
+    return z ^ (z >> 31)
@@ -0,0 +1,6 @@
+from src.logic.Piece import Piece
+from src.logic.MoveIndex import MoveIndex
+from src.logic.Cascade import Cascade, CascadeStep
+from src.logic.BoardLogic import BoardLogic
+
+(Piece, MoveIndex, Cascade, CascadeStep, BoardLogic)
@@ -12,22 +12,39 @@ from typing import Dict, Any
 
 import pygame
 
-from gale.state import BaseState
-from gale.text import render_text
+from gale.state import BaseState, StateMachine
 from gale.timer import Timer
 
 import settings
-from src.Board import Board
+from src.DirtyRects import DirtyRects
+from src.logic.MoveLog import MoveLog, level_seed
+from src.TextCache import render_text
 
 
 class BeginGameState(BaseState):
+    def __init__(self, state_machine: StateMachine, game) -> None:
+        super().__init__(state_machine)
+        self.game = game
+
     def enter(self, **enter_params: Dict[str, Any]) -> None:
         self.transition_alpha = 255
-        self.board = Board(settings.VIRTUAL_WIDTH - 272, 16)
         self.level_label_y = -64
         self.level = enter_params.get("level", 1)
         self.score = enter_params.get("score", 0)
 
+        # A new game gets a new log, and each level a board seeded from it.
+        # The board was usually built ahead by the factory.
+        self.log = enter_params.get("log")
+        if self.log is None:
+            self.log = MoveLog(
+                self.game.boards.take_game_seed(),
+                settings.BOARD_WIDTH,
+                settings.BOARD_HEIGHT,
+                settings.NUM_COLORS,
+                settings.NUM_VARIETIES,
+            )
+        self.board = self.game.boards.take(level_seed(self.log.seed, self.level))
+
         # A surface that supports alpha for the screen
         self.screen_alpha_surface = pygame.Surface(
             (settings.VIRTUAL_WIDTH, settings.VIRTUAL_HEIGHT), pygame.SRCALPHA
@@ -52,13 +69,24 @@ class BeginGameState(BaseState):
                         [(self, {"level_label_y": settings.VIRTUAL_HEIGHT + 30})],
                         # We are ready to play
                         on_finish=lambda: self.state_machine.change(
-                            "play", level=self.level, board=self.board, score=self.score
+                            "play",
+                            level=self.level,
+                            board=self.board,
+                            score=self.score,
+                            log=self.log,
                         ),
                     ),
                 ),
             ),
         )
 
+    def is_idle(self) -> bool:
+        return False
+
+    def update(self, dt: float) -> None:
+        # The screen fades and the label moves during the whole state
+        DirtyRects.mark_all()
+
     def render(self, surface: pygame.Surface) -> None:
         self.board.render(surface)
 
@@ -12,9 +12,10 @@ import pygame
 
 from gale.input_handler import InputData
 from gale.state import BaseState
-from gale.text import render_text
 
 import settings
+from src.DirtyRects import DirtyRects
+from src.TextCache import render_text
 
 
 class GameOverState(BaseState):
@@ -25,6 +26,10 @@ class GameOverState(BaseState):
         pygame.draw.rect(
             self.text_alpha_surface, (56, 56, 56, 234), pygame.Rect(0, 0, 424, 176)
         )
+        DirtyRects.mark_all()
+
+    def is_idle(self) -> bool:
+        return True
 
     def render(self, surface: pygame.Surface) -> None:
         surface.blit(self.text_alpha_surface, (settings.VIRTUAL_WIDTH // 2 - 212, 24))
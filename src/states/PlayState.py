@@ -10,23 +10,42 @@ This file contains the class PlayState.
 
 from typing import Dict, Any, List
 
+import time
+from itertools import count
+
 import pygame
 
 from gale.input_handler import InputData
-from gale.state import BaseState
-from gale.text import render_text
+from gale.state import BaseState, StateMachine
 from gale.timer import Timer
 
 import settings
-
-from src.Tile_power_up import Tile_power_up
+from src.DirtyRects import DirtyRects
+from src.FallTween import FallTween
+from src.FrameClock import FrameClock
+from src.logic import CascadeStep
+from src.logic.MoveLog import level_seed
+from src.TextCache import render_text
 
 
 class PlayState(BaseState):
+    def __init__(self, state_machine: StateMachine, game) -> None:
+        super().__init__(state_machine)
+        self.game = game
+
     def enter(self, **enter_params: Dict[str, Any]) -> None:
         self.level = enter_params["level"]
         self.board = enter_params["board"]
         self.score = enter_params["score"]
+        self.log = enter_params["log"]
+
+        # The board of the next level is built while this one is played
+        self.game.boards.prefetch(level_seed(self.log.seed, self.level + 1))
+
+        # Time since the level started and steps of the current cascade
+        # already scored, as recorded in the move log
+        self.elapsed = 0.0
+        self.played_steps = 0
 
         # Position in the grid which we are highlighting
         self.board_highlight_i1 = -1
@@ -68,27 +87,149 @@ class PlayState(BaseState):
 
         Timer.every(1, decrement_timer)
 
-    def update(self, _: float) -> None:
+        # Animates the falling tiles of the cascades
+        self.falling = FallTween()
+
+        # Values shown in the HUD and highlight drawn in the last frame
+        self.hud_values = None
+        self.drawn_highlight = None
+        DirtyRects.mark_all()
+
+        # The hint comes from the analysis worker, and it is shown after some
+        # time without moves.
+        self.analysis = self.game.analysis
+        self.hint = None
+        self.drawn_hint = None
+        self.time_without_moves = 0.0
+        self.__analyze_board()
+
+    def __analyze_board(self) -> None:
+        if self.analysis is not None:
+            self.analysis.submit(self.board)
+
+    def __hint_rect(self, hint) -> pygame.Rect:
+        i, j, di, dj = hint
+        return pygame.Rect(
+            j * settings.TILE_SIZE + self.board.x,
+            i * settings.TILE_SIZE + self.board.y,
+            (1 + dj) * settings.TILE_SIZE,
+            (1 + di) * settings.TILE_SIZE,
+        )
+
+    def __collect_dirty(self) -> None:
+        self.board.collect_dirty()
+
+        hud_values = (self.level, self.score, self.goal_score, self.timer)
+        if hud_values != self.hud_values:
+            self.hud_values = hud_values
+            DirtyRects.mark(pygame.Rect(16, 16, 212, 136))
+
+        highlight = (
+            (self.highlighted_i1, self.highlighted_j1)
+            if self.highlighted_tile
+            else None
+        )
+        if highlight != self.drawn_highlight:
+            for cell in (highlight, self.drawn_highlight):
+                if cell is not None:
+                    DirtyRects.mark(
+                        pygame.Rect(
+                            cell[1] * settings.TILE_SIZE + self.board.x,
+                            cell[0] * settings.TILE_SIZE + self.board.y,
+                            settings.TILE_SIZE,
+                            settings.TILE_SIZE,
+                        )
+                    )
+            self.drawn_highlight = highlight
+
+        hint = self.hint if self.time_without_moves >= settings.HINT_DELAY else None
+        if hint != self.drawn_hint:
+            for shown in (hint, self.drawn_hint):
+                if shown is not None:
+                    DirtyRects.mark(self.__hint_rect(shown))
+            self.drawn_hint = hint
+
+    def is_idle(self) -> bool:
+        # Nothing moves until the player does something, apart from the timer
+        return (
+            self.active
+            and not self.highlighted_tile
+            and not self.falling.active
+            and not self.board.moving_tiles
+            and self.board.shown_tiles is None
+        )
+
+    def __save_log(self) -> None:
+        self.log.finish(self.score, self.played_steps)
+
+        if not settings.RECORD_MOVE_LOGS:
+            return
+
+        settings.MOVE_LOG_DIR.mkdir(parents=True, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{self.log.seed}"
+
+        # Games with the same seed that end in the same second get a number
+        for n in count():
+            suffix = "" if n == 0 else f"-{n}"
+            try:
+                self.log.save(
+                    settings.MOVE_LOG_DIR / f"{name}{suffix}.m3log", exclusive=True
+                )
+                return
+            except FileExistsError:
+                pass
+
+    def update(self, dt: float) -> None:
+        self.elapsed += dt
+        self.falling.update(dt)
+
+        if self.active and not self.highlighted_tile:
+            self.time_without_moves += dt
+        else:
+            self.time_without_moves = 0.0
+
+        if self.analysis is not None:
+            # Results of older snapshots are dropped by the worker
+            analysis = self.analysis.poll()
+            self.hint = None if analysis is None else analysis.hint
+
         if self.timer <= 0:
             Timer.clear()
             settings.SOUNDS["game-over"].play()
+            self.__save_log()
             self.state_machine.change("game-over", score=self.score)
+            return
 
         if self.board.band_moving:
-            aux = self.board.is_match_board()
-            while not aux:
+            # The reshuffle always leaves a legal move
+            if not self.board.is_match_board():
                 self.board.randomize_board()
-                aux = self.board.is_match_board()
             self.board.band_moving = False
+            self.__analyze_board()
 
         if self.score >= self.goal_score:
             Timer.clear()
             settings.SOUNDS["next-level"].play()
-            self.state_machine.change("begin", level=self.level + 1, score=self.score)
+            self.state_machine.change(
+                "begin", level=self.level + 1, score=self.score, log=self.log
+            )
+            return
+
+        self.__collect_dirty()
 
     def render(self, surface: pygame.Surface) -> None:
+        self.falling.interpolate(FrameClock.alpha)
         self.board.render(surface)
 
+        if self.drawn_hint is not None:
+            pygame.draw.rect(
+                surface,
+                (255, 255, 255),
+                self.__hint_rect(self.drawn_hint),
+                width=2,
+                border_radius=7,
+            )
+
         if self.highlighted_tile:
             x = self.highlighted_j1 * settings.TILE_SIZE + self.board.x
             y = self.highlighted_i1 * settings.TILE_SIZE + self.board.y
@@ -196,7 +337,6 @@ class PlayState(BaseState):
                 self.highlighted_j1 = j
                 self.highlighted_i2 = i - 1
                 self.highlighted_j2 = j
-                self.active = False
             elif dir == 1: ##down:
                 self.highlighted_tile = True
                 self.highlighted_i1 = i
@@ -222,7 +362,11 @@ class PlayState(BaseState):
             tile2 = self.board.tiles[self.highlighted_i2][
                 self.highlighted_j2
             ]
-            
+
+            # No other swap starts until this one is undone or its whole
+            # cascade has been played
+            self.active = False
+
             def arrive():
                 tile1 = self.board.tiles[self.highlighted_i1][
                     self.highlighted_j1
@@ -230,39 +374,19 @@ class PlayState(BaseState):
                 tile2 = self.board.tiles[self.highlighted_i2][
                     self.highlighted_j2
                 ]
-                (
-                    self.board.tiles[tile1.i][tile1.j],
-                    self.board.tiles[tile2.i][tile2.j],
-                ) = (
-                    self.board.tiles[tile2.i][tile2.j],
-                    self.board.tiles[tile1.i][tile1.j],
-                )
-                (tile1.i, tile1.j, tile2.i, tile2.j) = (
-                    tile2.i,
-                    tile2.j,
-                    tile1.i,
-                    tile1.j,
-                )
+                self.board.swap_tiles(tile1, tile2)
 
-                matches = self.board.calculate_matches_for([tile2, tile1])
+                # The cascade is resolved at once and then played back
+                shown = [tile for row in self.board.tiles for tile in row]
+                cascade = self.board.resolve_cascade([tile2, tile1])
 
-                if matches is None:
+                if cascade.depth == 0:
                     def bad_move():
-                        (
-                            self.board.tiles[tile1.i][tile1.j],
-                            self.board.tiles[tile2.i][tile2.j],
-                        ) = (
-                            self.board.tiles[tile2.i][tile2.j],
-                            self.board.tiles[tile1.i][tile1.j],
-                        )
-                        tile1.i, tile1.j, tile2.i, tile2.j = (
-                            tile2.i,
-                            tile2.j,
-                            tile1.i,
-                            tile1.j,
-                        )
+                        self.board.swap_tiles(tile1, tile2)
+                        self.board.stop_moving([tile1, tile2])
                         self.active = True
                         self.highlighted_tile = False
+                        self.__analyze_board()
                     Timer.after(
                         0.50,
                         lambda: Timer.tween(
@@ -275,10 +399,22 @@ class PlayState(BaseState):
                         )
                     )
                 else:
+                    self.log.record(
+                        self.elapsed,
+                        self.highlighted_i1,
+                        self.highlighted_j1,
+                        dir,
+                    )
                     self.highlighted_tile = False
-                    self.__calculate_matches([tile1, tile2])
+                    self.board.stop_moving([tile1, tile2])
+                    self.board.show_tiles(shown)
+                    self.__play_cascade(cascade.steps, 0)
 
             # Swap tiles
+            if self.analysis is not None:
+                self.analysis.invalidate()
+            self.hint = None
+            self.board.start_moving([tile1, tile2])
             Timer.tween(
                 0.25,
                 [
@@ -288,38 +424,44 @@ class PlayState(BaseState):
                 on_finish=arrive,
             )
 
-    def __calculate_matches(self, tiles: List) -> None:
-        matches = self.board.calculate_matches_for(tiles)
+    def __play_cascade(self, steps: List[CascadeStep], index: int) -> None:
+        # The tiles removed by the step already played can be reused now
+        if index > 0:
+            self.board.recycle(steps[index - 1].removed)
 
-        if matches is None:
+        if index == len(steps):
+            self.played_steps = 0
+            self.board.show_board()
             self.board.band_moving = True
             self.active = True
             return
 
-        tile_power_up = self.board.calculate_power_up(tiles)
-        
+        step = steps[index]
+        self.played_steps = index + 1
+
         settings.SOUNDS["match"].stop()
         settings.SOUNDS["match"].play()
 
-        for match in matches:
-            self.score += len(match) * 50
-
-        self.score += self.board.score_power_up
+        self.score += step.score
 
-        self.board.remove_matches()
+        shown = self.board.shown_tiles
+        shown.difference_update(step.removed)
 
-        if tile_power_up is not None:
-            i = tile_power_up.i
-            j = tile_power_up.j
+        for tile, i in step.power_ups:
+            tile.y = i * settings.TILE_SIZE
+            shown.add(tile)
 
-            self.board.tiles[i][j] = tile_power_up
+        for tile, from_i, to_i in step.falls:
+            self.falling.add(
+                tile, from_i * settings.TILE_SIZE, to_i * settings.TILE_SIZE
+            )
 
-        falling_tiles = self.board.get_falling_tiles()
+        for tile, i in step.spawns:
+            shown.add(tile)
+            self.falling.add(
+                tile, (i - 1) * settings.TILE_SIZE, i * settings.TILE_SIZE
+            )
 
-        Timer.tween(
-            0.50,
-            falling_tiles,
-            on_finish=lambda: self.__calculate_matches(
-                [item[0] for item in falling_tiles]
-            ),
+        self.falling.start(
+            0.50, on_finish=lambda: self.__play_cascade(steps, index + 1)
         )
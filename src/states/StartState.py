@@ -14,10 +14,12 @@ import pygame
 
 from gale.input_handler import InputData
 from gale.state import BaseState, StateMachine
-from gale.text import render_text
 from gale.timer import Timer
 
 import settings
+from src.DirtyRects import DirtyRects
+from src.SpriteCache import SpriteCache
+from src.TextCache import render_text
 
 
 class StartState(BaseState):
@@ -34,9 +36,6 @@ class StartState(BaseState):
     # letters of MATCH 3 and their spacing relative to the center
     LETTER_TABLE = {"M": -108, "A": -64, "T": -28, "C": 2, "H": 40, "3": 112}
 
-    # A list of frames just for display.
-    frames = []
-
     def __init__(self, state_machine: StateMachine, game) -> None:
         super().__init__(state_machine)
         self.game = game
@@ -44,6 +43,9 @@ class StartState(BaseState):
     def enter(self) -> None:
         self.current_menu_item = 1
 
+        # The first board of the next game is built while the menu is shown
+        self.game.boards.prefetch_game()
+
         def shift_colors():
             last = self.colors[5]
 
@@ -57,27 +59,19 @@ class StartState(BaseState):
         self.alpha_transition = 0
 
         # Generate the full tile list for display
+        self.sprites = []
         for _ in range(settings.BOARD_WIDTH * settings.BOARD_HEIGHT):
             color = random.randint(0, settings.NUM_COLORS - 1)
             variety = random.randint(0, settings.NUM_VARIETIES - 1)
-            self.frames.append(settings.FRAMES["tiles"][color][variety])
+            self.sprites.append(
+                SpriteCache.get("tiles", color, variety, shadow_color=(0, 0, 0, 255))
+            )
 
         # A surface that supports alpha for the screen
         self.screen_alpha_surface = pygame.Surface(
             (settings.VIRTUAL_WIDTH, settings.VIRTUAL_HEIGHT), pygame.SRCALPHA
         )
 
-        # A surface that supports alpha for each tile to draw
-        self.tile_alpha_surface = pygame.Surface(
-            (settings.TILE_SIZE, settings.TILE_SIZE), pygame.SRCALPHA
-        )
-        pygame.draw.rect(
-            self.tile_alpha_surface,
-            (0, 0, 0, 255),
-            pygame.Rect(0, 0, settings.TILE_SIZE, settings.TILE_SIZE),
-            border_radius=7,
-        )
-
         # A surface that supports alpha for the title and the menu
         self.text_alpha_surface = pygame.Surface((300, 58), pygame.SRCALPHA)
         pygame.draw.rect(
@@ -88,23 +82,24 @@ class StartState(BaseState):
         # animate out.
         self.active = True
 
+    def is_idle(self) -> bool:
+        return False
+
+    def update(self, dt: float) -> None:
+        # The title changes colors all the time
+        DirtyRects.mark_all()
+
     def render(self, surface: pygame.Surface) -> None:
-        # Render all the tiles and their shadows
+        # Render all the tiles with their shadows
         for i in range(settings.BOARD_HEIGHT):
-            for j in range(settings.BOARD_HEIGHT):
+            for j in range(settings.BOARD_WIDTH):
                 x = j * settings.TILE_SIZE + 128
                 y = i * settings.TILE_SIZE + 16
 
-                # Frame position in the list
-                f = i * settings.BOARD_HEIGHT + j
+                # Sprite position in the list
+                f = i * settings.BOARD_WIDTH + j
 
-                surface.blit(settings.TEXTURES["tiles"], (x + 2, y + 2), self.frames[f])
-                surface.blit(self.tile_alpha_surface, (x + 2, y + 2))
-                surface.blit(
-                    settings.TEXTURES["tiles"],
-                    (x, y),
-                    self.frames[i * settings.BOARD_HEIGHT + j],
-                )
+                surface.blit(self.sprites[f], (x, y))
 
         # keep the background and tiles a little darker than normal
         pygame.draw.rect(
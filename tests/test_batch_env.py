@@ -0,0 +1,106 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the tests that BatchEnv plays a swap as BoardLogic does:
+same score and same board after the whole cascade, power-ups included.
+"""
+
+from typing import List
+
+import random
+
+import numpy as np
+
+from src.logic.ArrayBoard import match_mask
+from src.logic.BatchEnv import BatchEnv, NO_POWER_UP
+from src.logic.BoardLogic import BoardLogic
+from src.logic.Piece import KIND_POWER_UP
+
+NUM_COLORS = 5
+
+
+class SpawnColors:
+    # Gives BatchEnv the colors BoardLogic drew for the new tiles of each
+    # step, in the same row by row order.
+    def __init__(self, steps: List[List[int]]) -> None:
+        self.steps = steps
+
+    def integers(self, low: int, high: int, size: int) -> np.ndarray:
+        colors = self.steps.pop(0)
+        assert len(colors) == size
+        return np.array(colors)
+
+
+def arrays(board: BoardLogic):
+    colors = np.array([[tile.color for tile in row] for row in board.tiles])
+    power_ups = np.array(
+        [
+            [tile.variety if tile.kind == KIND_POWER_UP else NO_POWER_UP for tile in row]
+            for row in board.tiles
+        ]
+    )
+    return colors, power_ups
+
+
+def test_step_matches_board_logic() -> None:
+    played = 0
+
+    for seed in range(300):
+        board = BoardLogic(num_colors=NUM_COLORS, seed=seed)
+        rng = random.Random(seed)
+
+        # A few moves first, so some boards hold power-ups
+        for _ in range(rng.randint(0, 6)):
+            if not board.move_index.has_moves():
+                board.randomize_board()
+            i, j, di, dj = rng.choice(board.move_index.all_moves())
+            tile1, tile2 = board.tiles[i][j], board.tiles[i + di][j + dj]
+            board.swap_tiles(tile1, tile2)
+            board.resolve_cascade([tile2, tile1])
+
+        colors, power_ups = arrays(board)
+        if not board.move_index.has_moves() or match_mask(colors).any():
+            continue
+
+        i, j, di, dj = rng.choice(board.move_index.all_moves())
+        tile1, tile2 = board.tiles[i][j], board.tiles[i + di][j + dj]
+        board.swap_tiles(tile1, tile2)
+        cascade = board.resolve_cascade([tile2, tile1])
+
+        env = BatchEnv(1, num_colors=NUM_COLORS, max_steps=10**9)
+        env.colors[0] = colors
+        env.power_ups[0] = power_ups
+        if di == 0:
+            action = i * (env.width - 1) + j
+        else:
+            action = env.height * (env.width - 1) + i * env.width + j
+        env.masks[0, action] = True
+        env.rng = SpawnColors(
+            [
+                [
+                    color
+                    for _, _, color in sorted(
+                        (row, tile.j, tile.color) for tile, row in step.spawns
+                    )
+                ]
+                for step in cascade.steps
+            ]
+        )
+
+        _, rewards, _, info = env.step(np.array([action]))
+
+        # A board left without moves is shuffled by each one differently
+        if info["reshuffled"][0]:
+            continue
+
+        colors, power_ups = arrays(board)
+        assert rewards[0] == cascade.score
+        assert (env.colors[0] == colors).all()
+        assert (env.power_ups[0] == power_ups).all()
+        played += 1
+
+    assert played > 200
@@ -0,0 +1,96 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the tests that the indexes BoardLogic keeps up to date
+while it plays, the legal moves and the Zobrist hash, agree with the ones
+computed again from the whole board.
+"""
+
+from typing import List, Set
+
+import random
+
+import pytest
+
+from src.logic.BoardLogic import BoardLogic
+from src.logic.MoveIndex import Move
+
+
+def in_line(colors: List[List[int]], i: int, j: int) -> bool:
+    # Whether the cell is part of three or more equal colors in a line
+    height, width = len(colors), len(colors[0])
+    color = colors[i][j]
+
+    for di, dj in ((0, 1), (1, 0)):
+        length = 1
+        for sign in (1, -1):
+            ni, nj = i + sign * di, j + sign * dj
+            while 0 <= ni < height and 0 <= nj < width and colors[ni][nj] == color:
+                length += 1
+                ni, nj = ni + sign * di, nj + sign * dj
+        if length >= 3:
+            return True
+
+    return False
+
+
+def brute_force_moves(board: BoardLogic) -> Set[Move]:
+    colors = [[tile.color for tile in row] for row in board.tiles]
+    moves = set()
+
+    for i in range(board.height):
+        for j in range(board.width):
+            for di, dj in ((0, 1), (1, 0)):
+                i2, j2 = i + di, j + dj
+                if i2 >= board.height or j2 >= board.width:
+                    continue
+                if colors[i][j] == colors[i2][j2]:
+                    continue
+
+                colors[i][j], colors[i2][j2] = colors[i2][j2], colors[i][j]
+                if in_line(colors, i, j) or in_line(colors, i2, j2):
+                    moves.add((i, j, di, dj))
+                colors[i][j], colors[i2][j2] = colors[i2][j2], colors[i][j]
+
+    return moves
+
+
+def full_hash(board: BoardLogic) -> int:
+    # A new board given the same cells hashes them all from scratch
+    fresh = BoardLogic(
+        board.width,
+        board.height,
+        board.num_colors,
+        board.num_varieties,
+        board.num_varieties_power_ups,
+        seed=0,
+    )
+    fresh.set_cells(
+        *(
+            [[getattr(tile, name) for tile in row] for row in board.tiles]
+            for name in ("color", "variety", "kind")
+        )
+    )
+    return fresh.hash
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_indexes_follow_the_moves(seed: int) -> None:
+    rng = random.Random(seed)
+    board = BoardLogic(9, 7, 5, seed=seed)
+
+    for _ in range(100):
+        if not board.is_match_board():
+            board.randomize_board()
+        i, j, di, dj = rng.choice(board.move_index.all_moves())
+        tile1, tile2 = board.tiles[i][j], board.tiles[i + di][j + dj]
+        board.swap_tiles(tile1, tile2)
+        board.resolve_cascade([tile2, tile1], recycle=True)
+
+        assert set(board.move_index.all_moves()) == brute_force_moves(board)
+        assert board.hash == full_hash(board)
+        assert board.clone().hash == board.hash
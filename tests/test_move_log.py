@@ -0,0 +1,108 @@
+"""
+ISPPJ1 2024
+Study Case: Match-3
+
+Author: Alejandro Mujica
+alejandro.j.mujic4@gmail.com
+
+This file contains the round-trip tests of MoveLog at the edges of the
+fields of its header, and the test that a recorded game is replayed to the
+same score and board.
+"""
+
+from typing import Tuple
+
+import random
+
+import pytest
+
+from src.logic.BoardLogic import BoardLogic
+from src.logic.MoveLog import DIRECTIONS, MoveLog, level_seed
+from src.logic.Replayer import Replayer
+from src.logic.Simulator import goal_score
+
+
+def round_trip(log: MoveLog) -> MoveLog:
+    return MoveLog.from_bytes(log.to_bytes())
+
+
+@pytest.mark.parametrize("seed", [0, 1, -1, -(2**63), 2**63, 2**64 - 1])
+def test_seed(seed: int) -> None:
+    log = round_trip(MoveLog(seed))
+
+    assert log.seed == seed % 2**64
+    for level in (1, 2, 100):
+        assert level_seed(log.seed, level) == level_seed(seed, level)
+
+
+@pytest.mark.parametrize("last_steps", [0, 1, 255, 256, 65536, 2**32 - 1])
+def test_last_steps(last_steps: int) -> None:
+    log = MoveLog(7)
+    log.finish(123456789, last_steps)
+    log = round_trip(log)
+
+    assert log.score == 123456789
+    assert log.last_steps == last_steps
+
+
+def test_moves() -> None:
+    log = MoveLog(-5, 12, 9, 4, 3)
+    moves = [(0.5, 0, 0, 0), (12.25, 8, 11, 3), (60.0, 65535, 65535, 255)]
+    for move in moves:
+        log.record(*move)
+    log.finish(42)
+    log = round_trip(log)
+
+    assert (log.width, log.height, log.num_colors, log.num_varieties) == (12, 9, 4, 3)
+    assert log.moves == moves
+
+
+def test_other_version() -> None:
+    data = bytearray(MoveLog(1).to_bytes())
+    data[4] = 1
+
+    with pytest.raises(ValueError):
+        MoveLog.from_bytes(bytes(data))
+
+
+def record_game(seed: int, moves: int) -> Tuple[MoveLog, int]:
+    # Plays random swaps with the rules of PlayState and returns the log and
+    # the hash of the last board
+    rng = random.Random(seed)
+    log = MoveLog(seed, num_colors=5)
+    level, score = 1, 0
+    board = BoardLogic(num_colors=5, seed=level_seed(log.seed, level))
+
+    for k in range(moves):
+        i, j, di, dj = rng.choice(board.move_index.all_moves())
+        if rng.random() < 0.5:
+            i, j, di, dj = i + di, j + dj, -di, -dj
+        tile1, tile2 = board.tiles[i][j], board.tiles[i + di][j + dj]
+        board.swap_tiles(tile1, tile2)
+        cascade = board.resolve_cascade([tile2, tile1], recycle=True)
+        log.record(k * 0.5, i, j, DIRECTIONS.index((di, dj)))
+
+        goal = goal_score(level)
+        for step in cascade.steps:
+            score += step.score
+            if score >= goal:
+                break
+
+        if score >= goal:
+            level += 1
+            board = BoardLogic(num_colors=5, seed=level_seed(log.seed, level))
+        elif not board.is_match_board():
+            board.randomize_board()
+
+    log.finish(score)
+    return log, board.hash
+
+
+@pytest.mark.parametrize("seed", [3, -11])
+def test_replay(seed: int) -> None:
+    log, board_hash = record_game(seed, 150)
+    replayer = Replayer(round_trip(log))
+
+    assert replayer.run() == log.score
+    assert replayer.board.hash == board_hash
+    assert replayer.level > 1